@@ -0,0 +1,61 @@
+# async_backend.py
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import osm_backend as ob
+import poi_index as poi
+from kakaomap import kakao_keyword_search
+from weather import openweather_current
+
+# 백엔드 API의 asyncio 버전
+# HTTP 계층(풀 세션/레이트 리미터/디스크 캐시)은 스레드 기반이라
+# 각 호출을 asyncio.to_thread로 돌리고, 한 페이지에 필요한 조회를 동시에 모음
+
+
+async def build_courses_async(
+    bbox: Tuple[float, float, float, float], max_relations: int = 50
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(ob.build_courses, bbox, max_relations=max_relations)
+
+
+async def places_near_async(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(poi.places_near, lat, lon, radius_m)
+
+
+async def places_near_many_async(
+    centers: List[Tuple[float, float, int]]
+) -> List[List[Dict[str, Any]]]:
+    return await asyncio.to_thread(poi.places_near_many, centers)
+
+
+async def elevation_profile_async(
+    latlon: List[Tuple[float, float]], api_key: str
+) -> List[Dict[str, float]]:
+    return await asyncio.to_thread(ob.elevation_profile, latlon, api_key)
+
+
+async def kakao_keyword_search_async(query: str, **kwargs: Any) -> List[Dict[str, str]]:
+    return await asyncio.to_thread(kakao_keyword_search, query, **kwargs)
+
+
+async def openweather_current_async(lat: float, lon: float, api_key: str) -> Dict[str, Any]:
+    return await asyncio.to_thread(openweather_current, lat, lon, api_key)
+
+
+async def gather_calls(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    인자 없는 동기 함수들을 스레드에서 동시에 실행.
+    결과: {이름: 반환값 또는 발생한 예외}
+    """
+    names = list(calls)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(calls[n]) for n in names), return_exceptions=True
+    )
+    return dict(zip(names, results))
+
+
+def run(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """동기 코드(Streamlit 스크립트)에서 코루틴 실행"""
+    return asyncio.run(asyncio.wait_for(coro, timeout))
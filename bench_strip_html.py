@@ -0,0 +1,100 @@
+# bench_strip_html.py
+# strip_html: 기존 정규식 방식 vs html_text 단일 패스 추출기 비교
+#   python bench_strip_html.py                 # 저장된 코퍼스로 PostView 형태 페이지 합성
+#   python bench_strip_html.py --html-dir DIR  # 실제로 저장해 둔 *.html 사용
+from __future__ import annotations
+
+import argparse
+import glob
+import html
+import json
+import os
+import re
+import time
+
+from crawler import SAVE_DIR, extract_course_snippets
+from html_text import html_to_text
+
+
+def strip_html_regex(text: str) -> str:
+    # 교체 전 crawler.strip_html
+    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", text)
+    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
+    text = re.sub(r"(?is)<[^>]+>", " ", text)
+    text = html.unescape(text)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{2,}", "\n", text)
+    return text.strip()
+
+
+def synth_page(record: dict) -> str:
+    # 네이버 PostView처럼: 큰 head/script + 메뉴/푸터 + se-main-container 본문
+    lines = [record.get("title", ""), record.get("description", "")]
+    lines += record.get("course_snippets", [])
+    body = "".join(
+        f'<div class="se-component"><p class="se-text-paragraph">'
+        f"<span>{html.escape(ln)}</span></p></div>\n"
+        for ln in lines
+        if ln
+    )
+    script = "<script>var cfg = {" + ",".join(f'k{i}: "<b>{i}</b>"' for i in range(3000)) + "};</script>"
+    style = "<style>" + "".join(f".c{i}{{color:#{i % 999:03d}}}" for i in range(2000)) + "</style>"
+    menu = "".join(f'<li><a href="/m{i}">메뉴 코스 {i}</a></li>' for i in range(200))
+    return (
+        f"<html><head>{style}{script}</head><body><ul>{menu}</ul>"
+        f'<div id="post-area"><div class="se-main-container">{body}</div></div>'
+        f"{script}<footer>푸터</footer></body></html>"
+    )
+
+
+def load_pages(html_dir: str | None) -> list[str]:
+    if html_dir:
+        pages = []
+        for p in sorted(glob.glob(os.path.join(html_dir, "*.html"))):
+            with open(p, encoding="utf-8", errors="ignore") as f:
+                pages.append(f.read())
+        return pages
+    pages = []
+    for name in ("trekking_courses.json", "tasty_trekking_courses.json"):
+        path = os.path.join(SAVE_DIR, name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                pages += [synth_page(r) for r in json.load(f).get("results", [])]
+    return pages
+
+
+def bench(fn, pages: list[str], repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    out: list[str] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(p) for p in pages]
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--html-dir")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    pages = load_pages(args.html_dir)
+    if not pages:
+        print("페이지가 없습니다.")
+        return
+    mb = sum(len(p) for p in pages) / 1e6
+    print(f"pages={len(pages)} size={mb:.1f}MB")
+
+    t_old, old = bench(strip_html_regex, pages, args.repeat)
+    t_new, new = bench(html_to_text, pages, args.repeat)
+    print(f"regex     : {t_old * 1000:8.1f} ms")
+    print(f"html_text : {t_new * 1000:8.1f} ms  (x{t_old / max(t_new, 1e-9):.2f})")
+
+    old_sn = sum(len(extract_course_snippets(t)) for t in old)
+    new_sn = sum(len(extract_course_snippets(t)) for t in new)
+    print(f"snippets  : regex={old_sn} html_text={new_sn} (본문 외 메뉴/푸터 제외)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# course_catalog.py
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import osm_backend as ob
+from packed_line import PackedLine
+
+# 서울 전체 코스 카탈로그(오프라인 빌드 → 로컬 SQLite)
+# - 빌드: 서울 bbox 전체를 fetch_trails_relations + relation_to_course로 한 번에 변환
+# - 좌표(원본 + 지도용 단순화 단계)는 PackedLine 바이트 그대로 BLOB으로 저장(JSON 파싱/재계산 없음)
+# - 코스 bbox 컬럼 인덱스로 bbox 질의 → 페이지 로드 시 Overpass 호출 없이 수 ms
+# - 임시 파일에 만든 뒤 os.replace로 교체 → 앱은 빌드 중에도 이전 카탈로그를 읽음
+#
+#   python course_catalog.py            # cron 등으로 주기 실행
+#   python course_catalog.py --info
+
+CATALOG_PATH = os.getenv(
+    "COURSE_CATALOG_PATH", os.path.join(".cache", "course_catalog.sqlite3")
+)
+CATALOG_MAX_AGE_S = float(os.getenv("COURSE_CATALOG_MAX_AGE_S", str(60 * 60 * 24 * 7)))
+# 스키마가 바뀌면 올림 → 이전 카탈로그는 없는 것으로 취급(다시 빌드할 때까지 Overpass)
+CATALOG_VERSION = 4
+# 서울 전체 + 프리셋 반경이 모두 들어가도록 여유 있게
+SEOUL_BBOX = ob.bbox_from_center(37.5665, 126.9780, 24.0)
+
+_SCHEMA = """
+CREATE TABLE courses (
+    osm_id INTEGER PRIMARY KEY,
+    osm_version INTEGER NOT NULL,
+    course_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    distance_km REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    score REAL NOT NULL,
+    members INTEGER NOT NULL,
+    start_lat REAL NOT NULL,
+    start_lon REAL NOT NULL,
+    end_lat REAL NOT NULL,
+    end_lon REAL NOT NULL,
+    min_lat REAL NOT NULL,
+    min_lon REAL NOT NULL,
+    max_lat REAL NOT NULL,
+    max_lon REAL NOT NULL,
+    coords BLOB NOT NULL,
+    coords_sizes BLOB NOT NULL,
+    segments_coarse BLOB NOT NULL,
+    segments_coarse_sizes BLOB NOT NULL,
+    segments_fine BLOB NOT NULL,
+    segments_fine_sizes BLOB NOT NULL
+);
+CREATE INDEX courses_lat ON courses (min_lat, max_lat);
+CREATE INDEX courses_lon ON courses (min_lon, max_lon);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_COLUMNS = (
+    "osm_id", "osm_version", "course_id", "name", "distance_km", "difficulty", "score", "members",
+    "start_lat", "start_lon", "end_lat", "end_lon",
+)
+
+_BBOX_COLUMNS = ("min_lat", "min_lon", "max_lat", "max_lon")
+# PackedLine 값 컬럼(각각 <이름>, <이름>_sizes 두 BLOB)
+_GEOMETRY = ob.GEOMETRY_KEYS
+_GEOMETRY_SELECT = ", ".join(f"{g}, {g}_sizes" for g in _GEOMETRY)
+_SELECT = f"{', '.join(_COLUMNS)}, {_GEOMETRY_SELECT}"
+_SUMMARY_SELECT = ", ".join([*_COLUMNS, *_BBOX_COLUMNS])
+
+_refresh_lock = threading.Lock()
+_refreshing = False
+
+
+def build_catalog(
+    path: str = CATALOG_PATH,
+    bbox: Tuple[float, float, float, float] = SEOUL_BBOX,
+) -> int:
+    """bbox 안 전체 코스를 카탈로그로 저장. 저장한 코스 수"""
+    # 타일 캐시를 거치지 않음(stale 타일이 built_at=지금으로 찍히지 않도록)
+    rels = ob.fetch_trails_relations(bbox, max_relations=1_000_000, use_cache=False)
+    rows = []
+    for r in rels:
+        c = ob.relation_to_course(r)
+        if not c:
+            continue
+        rows.append(
+            (
+                *(c[k] for k in _COLUMNS),
+                *c["coords"].bbox(),
+                *(v for g in _GEOMETRY for v in (c[g].data, c[g].sizes)),
+            )
+        )
+
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO courses VALUES ({','.join('?' * 22)})", rows
+        )
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", str(CATALOG_VERSION)),
+                ("built_at", str(time.time())),
+                ("bbox", ",".join(str(v) for v in bbox)),
+                ("relations", str(len(rels))),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def _connect(path: str) -> Optional[sqlite3.Connection]:
+    if not os.path.exists(path):
+        return None
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def catalog_info(path: str = CATALOG_PATH) -> Optional[Dict[str, Any]]:
+    """built_at/bbox/courses. 카탈로그가 없으면 None"""
+    conn = _connect(path)
+    if conn is None:
+        return None
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        (n,) = conn.execute("SELECT COUNT(*) FROM courses").fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    if meta.get("version") != str(CATALOG_VERSION):
+        return None
+    return {
+        "built_at": float(meta.get("built_at", 0)),
+        "bbox": tuple(float(v) for v in meta.get("bbox", "0,0,0,0").split(",")),
+        "courses": n,
+    }
+
+
+def covers(
+    bbox: Tuple[float, float, float, float],
+    path: str = CATALOG_PATH,
+    max_age_s: Optional[float] = None,
+) -> bool:
+    """카탈로그가 bbox를 전부 포함하고(max_age_s가 있으면) 충분히 최근인지"""
+    info = catalog_info(path)
+    if not info:
+        return False
+    s, w, n, e = info["bbox"]
+    if not (s <= bbox[0] and w <= bbox[1] and bbox[2] <= n and bbox[3] <= e):
+        return False
+    return max_age_s is None or time.time() - info["built_at"] <= max_age_s
+
+
+def _row_to_geometry(row: Tuple[Any, ...]) -> Dict[str, PackedLine]:
+    return {g: PackedLine(row[2 * k], row[2 * k + 1]) for k, g in enumerate(_GEOMETRY)}
+
+
+def _row_to_course(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    n = len(_COLUMNS)
+    c = dict(zip(_COLUMNS, row[:n]))
+    c.update(_row_to_geometry(row[n:]))
+    return c
+
+
+def all_summaries(path: str = CATALOG_PATH) -> List[Dict[str, Any]]:
+    """카탈로그 전체 요약 행(좌표 BLOB은 읽지 않음, 중복 제거 없음). 메모리 공간 색인용"""
+    conn = _connect(path)
+    if conn is None:
+        return []
+    try:
+        cur = conn.execute(f"SELECT {_SUMMARY_SELECT} FROM courses")
+        return [dict(zip((*_COLUMNS, *_BBOX_COLUMNS), row)) for row in cur]
+    finally:
+        conn.close()
+
+
+def load_geometries(
+    osm_ids: List[int], path: str = CATALOG_PATH
+) -> Dict[int, Dict[str, PackedLine]]:
+    """osm_id -> 좌표 묶음(카탈로그에 있는 것만)"""
+    conn = _connect(path)
+    if conn is None or not osm_ids:
+        return {}
+    ids = [int(i) for i in osm_ids]
+    try:
+        cur = conn.execute(
+            f"SELECT osm_id, {_GEOMETRY_SELECT} FROM courses"
+            f" WHERE osm_id IN ({','.join('?' * len(ids))})",
+            ids,
+        )
+        return {row[0]: _row_to_geometry(row[1:]) for row in cur}
+    finally:
+        conn.close()
+
+
+def query_courses(
+    bbox: Tuple[float, float, float, float],
+    max_relations: int = 50,
+    path: str = CATALOG_PATH,
+) -> List[Dict[str, Any]]:
+    """
+    bbox와 겹치는 코스. build_courses와 같은 형태/정렬(rank_courses).
+    max_relations는 점수 상위 개수 제한으로 사용
+    """
+    conn = _connect(path)
+    if conn is None:
+        return []
+    s, w, n, e = bbox
+    try:
+        cur = conn.execute(
+            f"SELECT {_SELECT} FROM courses"
+            " WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?",
+            (s, n, w, e),
+        )
+        courses = [_row_to_course(row) for row in cur]
+    finally:
+        conn.close()
+    return ob.rank_courses(courses, limit=max_relations)
+
+
+def refresh_in_background(path: str = CATALOG_PATH) -> bool:
+    """백그라운드 스레드로 다시 빌드(한 번에 하나). 시작했으면 True"""
+    global _refreshing
+    with _refresh_lock:
+        if _refreshing:
+            return False
+        _refreshing = True
+
+    def run() -> None:
+        global _refreshing
+        try:
+            build_catalog(path)
+        except Exception:
+            pass  # 다음 주기에 다시 시도, 그동안은 기존 카탈로그 사용
+        finally:
+            with _refresh_lock:
+                _refreshing = False
+
+    threading.Thread(target=run, name="course-catalog-refresh", daemon=True).start()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="서울 코스 카탈로그 빌드")
+    ap.add_argument("--path", default=CATALOG_PATH)
+    ap.add_argument("--info", action="store_true", help="빌드하지 않고 현재 상태만 출력")
+    args = ap.parse_args(argv)
+
+    if not args.info:
+        t0 = time.time()
+        n = build_catalog(args.path)
+        print(f"코스 {n}개 저장 ({time.time() - t0:.1f}s): {args.path}")
+    info = catalog_info(args.path)
+    if info is None:
+        print("카탈로그 없음")
+        return
+    age_h = (time.time() - info["built_at"]) / 3600
+    print(f"코스 {info['courses']}개, bbox {info['bbox']}, {age_h:.1f}시간 전 빌드")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# course_index.py
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+from typing import Any, Iterable
+
+import course_catalog as cc
+import osm_backend as ob
+import snippets
+from snippet_dedup import DEFAULT_INPUTS, SAVE_DIR, iter_snippets, normalize
+
+# 블로그 코스 문장 ↔ OSM 코스 이름 연결 (오프라인 색인 단계)
+# - OSM relation 이름을 정규화(공백/기호 제거, 소문자)해서 별칭 트라이 정규식으로 컴파일
+# - 문장도 같은 방식으로 정규화 → "서울 둘레길 3코스"와 "서울둘레길3코스"가 같은 문자열
+# - 코스별 언급 글 수(글 단위 중복 제거)·언급 수를 JSON으로 저장
+# - main.py는 JSON만 읽어 랭킹에 인기도를 더함(요청 시 텍스트 처리 없음)
+#
+#   python course_index.py                  # 서울 전체 OSM 코스 + 기본 크롤 결과
+#   python course_index.py a.json b.jsonl -o out.json
+
+POPULARITY_JSON = os.path.join(SAVE_DIR, "course_popularity.json")
+SEOUL_CENTER = (37.5665, 126.9780, 18.0)  # main.py "서울 전체" 프리셋
+MIN_ALIAS_LEN = 4  # 정규화 후 이보다 짧은 별칭은 오탐이 많아 제외
+POPULARITY_WEIGHT = 0.5  # 랭킹 가산점 = weight · log(1 + 언급 글 수)
+
+# "서울둘레길 2코스 (용마·아차산 코스)" → 전체 / 괄호 밖 / 괄호 안
+_PAREN_RE = re.compile(r"[(\[（【](.*?)[)\]）】]")
+
+
+def name_aliases(name: str) -> list[str]:
+    """코스 이름 하나의 정규화 별칭들(길이 내림차순)"""
+    parts = [name, _PAREN_RE.sub(" ", name), *_PAREN_RE.findall(name)]
+    out = {normalize(p) for p in parts}
+    return sorted((a for a in out if len(a) >= MIN_ALIAS_LEN), key=len, reverse=True)
+
+
+class CourseNameIndex:
+    def __init__(self, names: Iterable[str]) -> None:
+        self.aliases: dict[str, list[str]] = {}  # 별칭 -> 코스 이름들
+        self.names: list[str] = []
+        for name in dict.fromkeys(names):
+            if not name:
+                continue
+            self.names.append(name)
+            for a in name_aliases(name):
+                owners = self.aliases.setdefault(a, [])
+                if name not in owners:
+                    owners.append(name)
+        # 트라이 모양이라 별칭 수와 거의 무관하게 문장을 한 번만 훑음(긴 별칭 우선)
+        self.pattern = re.compile(snippets.trie_pattern(self.aliases)) if self.aliases else None
+
+    def match(self, text: str) -> set[str]:
+        """문장에 언급된 코스 이름들"""
+        if self.pattern is None:
+            return set()
+        found: set[str] = set()
+        for m in self.pattern.finditer(normalize(text)):
+            found.update(self.aliases[m.group(0)])
+        return found
+
+
+def count_mentions(index: CourseNameIndex, paths: list[str]) -> dict[str, Any]:
+    posts: dict[str, set[str]] = {}
+    mentions: dict[str, int] = {}
+    n = 0
+    for _, post, sentence in iter_snippets(paths):
+        n += 1
+        for name in index.match(sentence):
+            posts.setdefault(name, set()).add(post)
+            mentions[name] = mentions.get(name, 0) + 1
+
+    courses = {
+        name: {
+            "posts": len(posts.get(name, ())),
+            "mentions": mentions.get(name, 0),
+            "aliases": name_aliases(name),
+        }
+        for name in index.names
+    }
+    courses = dict(sorted(courses.items(), key=lambda kv: kv[1]["posts"], reverse=True))
+    return {
+        "built_at": int(time.time()),
+        "inputs": [os.path.basename(p) for p in paths],
+        "snippets": n,
+        "matched_courses": sum(1 for c in courses.values() if c["posts"]),
+        "courses": courses,
+    }
+
+
+def load_popularity(path: str = POPULARITY_JSON) -> dict[str, int]:
+    """코스 이름 -> 언급 글 수. 파일이 없으면 빈 dict"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: int(c.get("posts", 0)) for name, c in (data.get("courses") or {}).items()}
+
+
+def popularity_boost(posts: Any) -> Any:
+    """랭킹 가산점. 숫자·pandas Series 모두 가능"""
+    if hasattr(posts, "map"):
+        return posts.map(lambda p: POPULARITY_WEIGHT * math.log1p(p))
+    return POPULARITY_WEIGHT * math.log1p(posts)
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="블로그 문장 ↔ OSM 코스 이름 색인/인기도 계산")
+    ap.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS)
+    ap.add_argument("-o", "--output", default=POPULARITY_JSON)
+    ap.add_argument("--max-relations", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    bbox = ob.bbox_from_center(*SEOUL_CENTER)
+    if cc.covers(bbox):  # 카탈로그가 있으면 Overpass 없이
+        courses = cc.query_courses(bbox, max_relations=1_000_000)
+    else:
+        courses = ob.build_courses(bbox, max_relations=args.max_relations)
+    index = CourseNameIndex(c["name"] for c in courses)
+    print(f"OSM 코스 {len(index.names)}개, 별칭 {len(index.aliases)}개")
+
+    out = count_mentions(index, args.inputs)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+    print(f"문장 {out['snippets']}개 → 언급된 코스 {out['matched_courses']}개")
+    print(f"JSON 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# crawl_index.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+# 증분 수집용 "이미 수집한 글" 인덱스 (JSON 파일 하나)
+# post_key(blogId:logNo) -> {
+#   "url", "fetched_url", "etag", "last_modified",
+#   "content_hash", "fetched_at", "snippets"
+# }
+
+
+class CrawlIndex:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f).get("posts", {})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            e = self._entries.get(key)
+            return dict(e) if e else None
+
+    def is_fresh(self, key: str, max_age_s: float) -> bool:
+        e = self.get(key)
+        return bool(e) and time.time() - float(e.get("fetched_at", 0)) < max_age_s
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = {**entry, "fetched_at": entry.get("fetched_at", time.time())}
+            self._dirty = True
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["fetched_at"] = time.time()
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "posts": self._entries}
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
@@ -1,20 +1,54 @@
+import argparse
+import hashlib
 import html
 import json
 import os
 import re
 import sys
+import threading
 import time
 import urllib.parse
-import urllib.request
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+import requests
+
+import http_client
+import jsonl_store
+import naver_url
+import snippets
+from crawl_index import CrawlIndex
+from html_text import html_to_text
+from ratelimit import TokenBucket, parse_retry_after
 
 # 네이버 검색 API(블로그) -> 링크 수집 -> 블로그 본문에서 "코스" 문장 추출 -> JSON 저장
+# 여러 검색어를 한 작업으로 처리(같은 글은 한 번만 수집). 사용법: python crawler.py --help
 
 QUERY = "용산구 트레킹"
 DISPLAY = 50  # 1~100
 START = 1     # 1~1000
 SAVE_DIR = "naver_blog_trekking"
 OUTPUT_JSON = os.path.join(SAVE_DIR, "trekking_courses.json")
+# 작업 상태 파일은 결과 폴더(저장소에 커밋됨)가 아닌 .cache/에
+CACHE_DIR = ".cache"
+INDEX_JSON = os.path.join(CACHE_DIR, "crawl_index.json")
+URL_CACHE_JSON = os.path.join(CACHE_DIR, "url_cache.json")  # 링크 -> (blogId, logNo) 해석 결과
+INDEX_MAX_AGE_DAYS = 7.0  # 증분 모드: 이 기간 안에 수집한 글은 요청 없이 재사용
+
+SEOUL_GU = [
+    "종로구", "중구", "용산구", "성동구", "광진구", "동대문구", "중랑구", "성북구",
+    "강북구", "도봉구", "노원구", "은평구", "서대문구", "마포구", "양천구", "강서구",
+    "구로구", "금천구", "영등포구", "동작구", "관악구", "서초구", "강남구", "송파구",
+    "강동구",
+]
+
+# 본문 수집 동시성/예의(호스트별 초당 요청 수)/타임아웃/재시도
+CONCURRENCY = 8
+HOST_RATE_PER_S = 4.0
+FETCH_TIMEOUT_S = 10
+FETCH_RETRIES = 2
+INDEX_SAVE_EVERY = 50  # 증분 인덱스/URL 캐시를 이만큼 글마다 중간 저장(강제 종료 대비)
 
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID", "").strip()
 NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET", "").strip()
@@ -32,153 +66,477 @@ def ensure_dir(path: str) -> None:
 
 
 def api_request(query: str, display: int, start: int) -> dict:
-    enc_query = urllib.parse.quote(query)
-    url = (
-        "https://openapi.naver.com/v1/search/blog.json?"
-        f"query={enc_query}&display={display}&start={start}&sort=sim"
+    res = http_client.get(
+        "https://openapi.naver.com/v1/search/blog.json",
+        params={"query": query, "display": display, "start": start, "sort": "sim"},
+        headers={
+            "X-Naver-Client-Id": NAVER_CLIENT_ID,
+            "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
+        },
     )
-    req = urllib.request.Request(url)
-    req.add_header("X-Naver-Client-Id", NAVER_CLIENT_ID)
-    req.add_header("X-Naver-Client-Secret", NAVER_CLIENT_SECRET)
-    with urllib.request.urlopen(req) as res:
-        if res.status != 200:
-            raise RuntimeError(f"HTTP {res.status}")
-        data = res.read().decode("utf-8")
-        return json.loads(data)
-
-
-def fetch_html(url: str) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(req, timeout=10) as res:
-        return res.read().decode("utf-8", errors="ignore")
+    if res.status_code != 200:
+        raise RuntimeError(f"HTTP {res.status_code}")
+    return json.loads(res.content.decode("utf-8"))
+
+
+_host_buckets: dict[str, TokenBucket] = {}
+_host_buckets_lock = threading.Lock()
+
+
+def host_bucket(url: str) -> TokenBucket:
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _host_buckets_lock:
+        b = _host_buckets.get(host)
+        if b is None:
+            b = _host_buckets[host] = TokenBucket(HOST_RATE_PER_S, HOST_RATE_PER_S)
+        return b
+
+
+def fetch_response(
+    url: str,
+    headers: dict[str, str] | None = None,
+    timeout: float = FETCH_TIMEOUT_S,
+    retries: int = FETCH_RETRIES,
+) -> requests.Response:
+    # 연결 오류/타임아웃/429/5xx만 재시도, 그 외 4xx는 바로 실패
+    # 429는 호스트 버킷만 멈춤(Retry-After, 없으면 wait_s) → 다음 acquire가 대기.
+    # 같은 호스트의 다른 요청도 함께 기다리고, 따로 sleep하지 않음
+    wait_s = 1.0
+    for attempt in range(retries + 1):
+        bucket = host_bucket(url)
+        bucket.acquire()
+        try:
+            res = http_client.get(
+                url, headers={"User-Agent": USER_AGENT, **(headers or {})}, timeout=timeout
+            )
+            if res.status_code == 429:
+                retry_after = parse_retry_after(res.headers.get("Retry-After"))
+                bucket.penalize(retry_after if retry_after is not None else wait_s)
+            res.raise_for_status()
+            return res
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if attempt >= retries or (400 <= status < 500 and status != 429):
+                raise
+            if status == 429:
+                wait_s *= 2
+                continue
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+        time.sleep(wait_s)
+        wait_s *= 2
+    raise RuntimeError(f"fetch failed: {url}")
+
+
+def fetch_html(
+    url: str, timeout: float = FETCH_TIMEOUT_S, retries: int = FETCH_RETRIES
+) -> str:
+    res = fetch_response(url, timeout=timeout, retries=retries)
+    return res.content.decode("utf-8", errors="ignore")
 
 
 def parse_blog_id_logno(url: str) -> tuple[str, str] | tuple[None, None]:
-    patterns = [
-        r"blogId=([^&]+)&logNo=(\d+)",
-        r"blog.naver.com/([^/]+)/(\d+)",
-        r"m.blog.naver.com/([^/]+)/(\d+)",
-    ]
-    for p in patterns:
-        m = re.search(p, url)
-        if m:
-            return m.group(1), m.group(2)
-    return None, None
+    # 모바일/blog.me/리다이렉트 등 여러 형태는 naver_url 참고
+    ref = naver_url.parse_post_ref(url)
+    return ref if ref else (None, None)
 
 
 def build_post_url(blog_id: str, log_no: str) -> str:
-    return f"https://blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}&redirect=Dlog"
+    return naver_url.post_endpoint(blog_id, log_no)
 
 
 def strip_html(text: str) -> str:
-    # script/style 제거
-    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", text)
-    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
-    # 태그 제거
-    text = re.sub(r"(?is)<[^>]+>", " ", text)
-    # 엔티티 처리
-    text = html.unescape(text)
-    # 공백 정리
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{2,}", "\n", text)
-    return text.strip()
+    # 한 번의 파싱으로 script/style 제거 + 본문 컨테이너만 텍스트로(html_text 참고)
+    return html_to_text(text)
+
+
+# 키워드/동의어는 snippets.DEFAULT_KEYWORDS, --keywords-file로 교체 가능
+SNIPPET_MATCHER = snippets.DEFAULT_MATCHER
 
 
 def extract_course_snippets(text: str) -> list[str]:
-    sentences = re.split(r"(?<=[.!?])\s+|\n+", text)
-    keywords = ["코스", "루트", "경로", "산책로"]
-    return [s.strip() for s in sentences if any(k in s for k in keywords)]
+    return SNIPPET_MATCHER.sentences(text)
 
 
 def count_snippet_mentions(snippets: list[str]) -> dict[str, int]:
     return dict(Counter(snippets))
 
 
+def post_url_for(url: str) -> str:
+    # iframe 껍데기 페이지 대신 본문 엔드포인트로(필요하면 한 번 요청해 해석, 결과 캐시)
+    # 해석 요청도 본문과 같은 User-Agent/호스트별 토큰 버킷/재시도로
+    return naver_url.resolve_post_url(url, fetch=fetch_response)
+
+
 def fetch_course_snippets_from_blog(url: str) -> tuple[list[str], str]:
-    blog_id, log_no = parse_blog_id_logno(url)
-    target_url = build_post_url(blog_id, log_no) if blog_id and log_no else url
+    target_url = post_url_for(url)
     html_doc = fetch_html(target_url)
     text = strip_html(html_doc)
     snippets = extract_course_snippets(text)
     return snippets, target_url
 
 
-def main() -> None:
-    if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
-        print("에러: NAVER_CLIENT_ID / NAVER_CLIENT_SECRET 환경변수가 필요합니다.")
-        sys.exit(1)
-
-    ensure_dir(SAVE_DIR)
-
-    all_items = []
-    start = START
-
-    while len(all_items) < DISPLAY and start <= 1000:
-        remaining = DISPLAY - len(all_items)
+def search_items(query: str, display: int = DISPLAY, start: int = START) -> list[dict]:
+    all_items: list[dict] = []
+    while len(all_items) < display and start <= 1000:
+        remaining = display - len(all_items)
         batch = min(100, remaining)
-        result = api_request(QUERY, batch, start)
+        result = api_request(query, batch, start)
         items = result.get("items", [])
         if not items:
             break
         all_items.extend(items)
         start += batch
         time.sleep(0.2)
+    return all_items
+
+
+def post_key(link: str) -> str:
+    """같은 글이면 검색어가 달라도 같은 키(blogId:logNo, 못 풀면 링크)"""
+    blog_id, log_no = parse_blog_id_logno(link)
+    return f"{blog_id}:{log_no}" if blog_id and log_no else link
+
+
+def fetch_post(link: str) -> dict:
+    """글 본문 수집 + 코스 문장 추출(검색어와 무관한 부분)"""
+    try:
+        snippets, fetched_url = fetch_course_snippets_from_blog(link)
+        return {"snippets": snippets, "fetched_url": fetched_url, "error": ""}
+    except Exception as e:
+        return {"snippets": [], "fetched_url": link, "error": str(e)}
+
+
+def fetch_post_incremental(
+    link: str, index: CrawlIndex, max_age_s: float = INDEX_MAX_AGE_DAYS * 86400
+) -> dict:
+    """
+    인덱스 기반 증분 수집
+    - max_age_s 안에 수집한 글: 요청 없이 재사용
+    - 그 외: ETag/Last-Modified 조건부 GET, 304거나 본문 해시가 같으면 재파싱 생략
+    """
+    key = post_key(link)
+    entry = index.get(key)
+    if entry and index.is_fresh(key, max_age_s):
+        return {"snippets": entry["snippets"], "fetched_url": entry["fetched_url"], "error": ""}
+
+    target_url = post_url_for(link)
+    cond: dict[str, str] = {}
+    if entry and entry.get("etag"):
+        cond["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        cond["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        res = fetch_response(target_url, headers=cond)
+    except Exception as e:
+        if entry:
+            # 이전 결과가 있으면 실패해도 그대로 사용
+            return {"snippets": entry["snippets"], "fetched_url": entry["fetched_url"], "error": ""}
+        return {"snippets": [], "fetched_url": target_url, "error": str(e)}
+
+    if res.status_code == 304 and entry:
+        index.touch(key)
+        return {"snippets": entry["snippets"], "fetched_url": entry["fetched_url"], "error": ""}
+
+    body = res.content
+    content_hash = hashlib.sha256(body).hexdigest()
+    if entry and entry.get("content_hash") == content_hash:
+        snippets = entry["snippets"]
+    else:
+        snippets = extract_course_snippets(strip_html(body.decode("utf-8", errors="ignore")))
+
+    index.put(
+        key,
+        {
+            "url": link,
+            "fetched_url": target_url,
+            "etag": res.headers.get("ETag", ""),
+            "last_modified": res.headers.get("Last-Modified", ""),
+            "content_hash": content_hash,
+            "snippets": snippets,
+            "fetched_at": time.time(),
+        },
+    )
+    return {"snippets": snippets, "fetched_url": target_url, "error": ""}
+
+
+def build_record(item: dict, fetched: dict) -> dict:
+    link = item.get("link", "")
+    description = html.unescape(item.get("description", "") or "")
+
+    snippets = fetched["snippets"]
+    source = "content" if snippets else "none"
+    if not snippets:
+        # 본문에서 못 찾으면 요약(description)에서 추출
+        snippets = extract_course_snippets(description)
+        if snippets:
+            source = "description"
+
+    snippet_counts = count_snippet_mentions(snippets)
+    total_mentions = sum(snippet_counts.values())
+
+    return {
+        "title": html.unescape(item.get("title", "") or ""),
+        "link": link,
+        "fetched_url": fetched["fetched_url"],
+        "description": description,
+        "course_snippets": snippets,
+        "course_snippet_counts": snippet_counts,
+        "course_mentions_count": total_mentions,
+        "source": source,
+        "error": fetched["error"],
+    }
 
-    results = []
-    for item in all_items:
-        link = item.get("link", "")
-        description = html.unescape(item.get("description", "") or "")
-
-        snippets = []
-        source = "none"
-        fetched_url = link
-        error = ""
 
-        try:
-            snippets, fetched_url = fetch_course_snippets_from_blog(link)
-            if snippets:
-                source = "content"
-            else:
-                # 본문에서 못 찾으면 요약(description)에서 추출
-                snippets = extract_course_snippets(description)
-                if snippets:
-                    source = "description"
-        except Exception as e:
-            error = str(e)
-            snippets = extract_course_snippets(description)
-            if snippets:
-                source = "description"
-
-        snippet_counts = count_snippet_mentions(snippets)
-        total_mentions = sum(snippet_counts.values())
-
-        results.append(
-            {
-                "title": html.unescape(item.get("title", "") or ""),
-                "link": link,
-                "fetched_url": fetched_url,
-                "description": description,
-                "course_snippets": snippets,
-                "course_snippet_counts": snippet_counts,
-                "course_mentions_count": total_mentions,
-                "source": source,
-                "error": error,
+def iter_fetched_posts(
+    links: dict[str, str],
+    concurrency: int = CONCURRENCY,
+    index: CrawlIndex | None = None,
+    max_age_s: float = INDEX_MAX_AGE_DAYS * 86400,
+) -> Iterator[tuple[str, dict]]:
+    """{post_key: link}를 동시에 수집. 끝나는 순서대로 (post_key, fetch_post 결과)"""
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        if index is None:
+            futures = {pool.submit(fetch_post, link): key for key, link in links.items()}
+        else:
+            futures = {
+                pool.submit(fetch_post_incremental, link, index, max_age_s): key
+                for key, link in links.items()
             }
+        for f in as_completed(futures):
+            yield futures[f], f.result()
+
+
+def output_path_for(query: str) -> str:
+    slug = re.sub(r"[^\w]+", "_", query).strip("_")
+    return os.path.join(SAVE_DIR, f"{slug}.json")
+
+
+class OutputTarget:
+    """
+    출력 파일 하나(검색어별 또는 combined).
+    entries: 이 파일에 들어갈 (post_key, 검색 item, 추가 필드) 순서 목록
+    결과는 .jsonl에 바로바로 쓰고, 끝나면 .json 문서로 compaction
+    """
+
+    def __init__(
+        self,
+        json_path: str,
+        header: dict,
+        entries: list[tuple[str, dict, dict]],
+        resume: bool = False,
+    ) -> None:
+        self.json_path = json_path
+        self.jsonl_path = jsonl_store.jsonl_path_for(json_path)
+        self.header = header
+        self.order: dict[str, int] = {}
+        for i, (_, item, _) in enumerate(entries):
+            self.order.setdefault(item.get("link", ""), i)
+
+        # 링크별 마지막 기록이 성공인 글만 완료로 봄(error 기록은 다시 수집)
+        done: set[str] = set()
+        if resume:
+            done = {r.get("link", "") for r in self.records() if not r.get("error")}
+        self.by_key: dict[str, list[tuple[dict, dict]]] = {}
+        for key, item, extra in entries:
+            if item.get("link", "") not in done:
+                self.by_key.setdefault(key, []).append((item, extra))
+        self.writer = jsonl_store.JsonlWriter(self.jsonl_path, append=resume)
+
+    def records(self) -> list[dict]:
+        """.jsonl 기록(같은 링크가 여러 번이면 나중 것)"""
+        return jsonl_store.read_latest(self.jsonl_path, key=lambda r: r.get("link", ""))
+
+    def pending_keys(self) -> set[str]:
+        return set(self.by_key)
+
+    def write_post(self, key: str, post: dict) -> None:
+        for item, extra in self.by_key.pop(key, []):
+            self.writer.write({**build_record(item, post), **extra})
+
+    def compact(self) -> list[dict]:
+        self.writer.close()
+        return jsonl_store.compact_jsonl(
+            self.jsonl_path,
+            self.json_path,
+            self.header,
+            sort_key=lambda r: self.order.get(r.get("link", ""), len(self.order)),
+            key=lambda r: r.get("link", ""),
         )
 
-        time.sleep(0.2)
 
-    output = {
-        "query": QUERY,
-        "count": len(results),
-        "results": results,
-    }
+def run_job(
+    queries: list[str],
+    outputs: dict[str, str] | None = None,
+    combined_path: str | None = None,
+    display: int = DISPLAY,
+    concurrency: int = CONCURRENCY,
+    index: CrawlIndex | None = None,
+    max_age_s: float = INDEX_MAX_AGE_DAYS * 86400,
+    resume: bool = False,
+    compact: bool = True,
+) -> dict[str, list[dict]]:
+    """
+    여러 검색어를 한 번에 처리.
+    - 검색 결과 링크는 post_key로 중복 제거 → 같은 글은 한 번만 다운로드/파싱
+    - index가 있으면 증분 수집(fetch_post_incremental)
+    - combined_path가 없으면 검색어별 파일(outputs 또는 output_path_for)
+    - 글 하나가 끝날 때마다 출력 파일 옆 .jsonl에 바로 기록.
+      resume이면 기존 .jsonl에 있는 글은 건너뜀, compact면 마지막에 .json 문서 생성
+    반환: {출력 json 경로: 결과 목록}
+    """
+    ensure_dir(SAVE_DIR)
+    ensure_dir(CACHE_DIR)
+    naver_url.load_cache(URL_CACHE_JSON)
+
+    items_by_query: dict[str, list[dict]] = {}
+    links: dict[str, str] = {}
+    for q in queries:
+        items = search_items(q, display=display)
+        items_by_query[q] = items
+        for item in items:
+            link = item.get("link", "")
+            links.setdefault(post_key(link), link)
+        print(f"검색: {q} → {len(items)}건 (고유 글 누적 {len(links)})")
+
+    targets: list[OutputTarget] = []
+    if combined_path:
+        first: dict[str, dict] = {}
+        found_by: dict[str, list[str]] = {}
+        for q, items in items_by_query.items():
+            for item in items:
+                key = post_key(item.get("link", ""))
+                first.setdefault(key, item)
+                if q not in found_by.setdefault(key, []):
+                    found_by[key].append(q)
+        entries = [(k, item, {"queries": found_by[k]}) for k, item in first.items()]
+        targets.append(OutputTarget(combined_path, {"queries": queries}, entries, resume))
+    else:
+        for q, items in items_by_query.items():
+            path = (outputs or {}).get(q) or output_path_for(q)
+            entries = [(post_key(it.get("link", "")), it, {}) for it in items]
+            targets.append(OutputTarget(path, {"query": q}, entries, resume))
+
+    todo = {k: links[k] for k in set().union(*(t.pending_keys() for t in targets))}
+    if resume:
+        print(f"이어서 수집: 남은 글 {len(todo)}/{len(links)}건")
+    if index is not None:
+        fresh = sum(index.is_fresh(k, max_age_s) for k in todo)
+        print(f"증분 모드: 인덱스 {len(index)}건, 이번에 재사용 {fresh}/{len(todo)}건")
+
+    try:
+        posts = iter_fetched_posts(todo, concurrency, index=index, max_age_s=max_age_s)
+        for done, (key, post) in enumerate(posts, 1):
+            for t in targets:
+                t.write_post(key, post)
+            state = post["error"] or f"{len(post['snippets'])} snippets"
+            print(f"[{done}/{len(todo)}] {key} {state}")
+            if done % INDEX_SAVE_EVERY == 0:
+                if index is not None:
+                    index.save()
+                naver_url.save_cache(URL_CACHE_JSON)
+    finally:
+        for t in targets:
+            t.writer.close()
+        if index is not None:
+            index.save()
+        naver_url.save_cache(URL_CACHE_JSON)
+
+    out: dict[str, list[dict]] = {}
+    for t in targets:
+        if compact:
+            out[t.json_path] = t.compact()
+            print(f"JSON 저장: {t.json_path}")
+        else:
+            out[t.json_path] = t.records()
+            print(f"JSONL 저장: {t.jsonl_path}")
+    return out
+
+
+def read_queries_file(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [ln.strip() for ln in f if ln.strip() and not ln.startswith("#")]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="네이버 블로그 코스 문장 수집")
+    ap.add_argument("--query", action="append", default=[], help="검색어(여러 번 지정 가능)")
+    ap.add_argument("--queries-file", help="한 줄에 검색어 하나인 파일")
+    ap.add_argument(
+        "--seoul-gu",
+        action="append",
+        default=[],
+        metavar="TOPIC",
+        help='서울 25개 구 × TOPIC 검색어 생성(예: --seoul-gu 트레킹 --seoul-gu "트레킹 맛집")',
+    )
+    ap.add_argument("--output", help="검색어가 하나일 때 출력 파일")
+    ap.add_argument("--combined", help="모든 검색어를 합친 출력 파일")
+    ap.add_argument("--display", type=int, default=DISPLAY)
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ap.add_argument(
+        "--incremental", action="store_true", help="수집 인덱스로 바뀐/새 글만 수집"
+    )
+    ap.add_argument("--index", default=INDEX_JSON, help="증분 수집 인덱스 파일")
+    ap.add_argument(
+        "--max-age-days",
+        type=float,
+        default=INDEX_MAX_AGE_DAYS,
+        help="증분 모드에서 요청 없이 재사용할 기간(일). 0이면 항상 조건부 GET",
+    )
+    ap.add_argument(
+        "--keywords-file",
+        help='코스 키워드 JSON: {"대표 키워드": ["동의어", ...]} (기본: snippets.DEFAULT_KEYWORDS)',
+    )
+    ap.add_argument(
+        "--resume", action="store_true", help="중단된 작업의 .jsonl을 읽어 남은 글만 수집"
+    )
+    ap.add_argument(
+        "--no-compact", action="store_true", help=".jsonl만 남기고 .json 문서는 만들지 않음"
+    )
+    return ap.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
 
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
+        print("에러: NAVER_CLIENT_ID / NAVER_CLIENT_SECRET 환경변수가 필요합니다.")
+        sys.exit(1)
 
+    global SNIPPET_MATCHER
+    if args.keywords_file:
+        with open(args.keywords_file, encoding="utf-8") as f:
+            SNIPPET_MATCHER = snippets.SnippetMatcher(json.load(f))
+
+    queries = list(args.query)
+    if args.queries_file:
+        queries += read_queries_file(args.queries_file)
+    queries += [f"{gu} {topic}" for topic in args.seoul_gu for gu in SEOUL_GU]
+    queries = list(dict.fromkeys(queries))
+
+    outputs: dict[str, str] = {}
+    if not queries:
+        queries = [QUERY]
+        outputs[QUERY] = OUTPUT_JSON
+    if args.output:
+        if len(queries) != 1:
+            print("에러: --output은 검색어가 하나일 때만 쓸 수 있습니다. (--combined 사용)")
+            sys.exit(1)
+        outputs[queries[0]] = args.output
+
+    run_job(
+        queries,
+        outputs=outputs,
+        combined_path=args.combined,
+        display=args.display,
+        concurrency=args.concurrency,
+        index=CrawlIndex(args.index) if args.incremental else None,
+        max_age_s=args.max_age_days * 86400,
+        resume=args.resume,
+        compact=not args.no_compact,
+    )
     print("완료")
-    print(f"JSON 저장: {OUTPUT_JSON}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+# geo.py
+from __future__ import annotations
+
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+# 배열 기반 거리 계산 ((N, 2) float64 [lat, lon] 배열)
+# osm_backend.haversine_m과 같은 식을 NumPy로 한 번에 계산
+# - segment_lengths_m: 이웃한 점 사이 거리 (N-1,)
+# - cumulative_m: 시작점부터 누적 거리 (N,)
+# - distances_from: 한 점 → 여러 점 거리 (N,)
+# - simplify: Douglas-Peucker 단순화(허용 오차 m)
+
+EARTH_RADIUS_M = 6371000.0
+
+LatLon = Union[np.ndarray, Sequence[Tuple[float, float]]]
+
+
+def as_array(latlon: LatLon) -> np.ndarray:
+    """[(lat, lon), ...] 또는 배열 -> (N, 2) float64"""
+    arr = np.asarray(latlon, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 2)
+    return arr.reshape(-1, 2)
+
+
+def haversine_m(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """브로드캐스트되는 haversine (m)"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * (
+        np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+def segment_lengths_m(latlon: LatLon) -> np.ndarray:
+    arr = as_array(latlon)
+    if len(arr) < 2:
+        return np.zeros(0)
+    return haversine_m(arr[:-1, 0], arr[:-1, 1], arr[1:, 0], arr[1:, 1])
+
+
+def cumulative_m(latlon: LatLon) -> np.ndarray:
+    arr = as_array(latlon)
+    out = np.zeros(len(arr))
+    if len(arr) >= 2:
+        np.cumsum(segment_lengths_m(arr), out=out[1:])
+    return out
+
+
+def polyline_length_m(latlon: LatLon) -> float:
+    return float(segment_lengths_m(latlon).sum())
+
+
+def distances_from(lat: float, lon: float, latlon: LatLon) -> np.ndarray:
+    arr = as_array(latlon)
+    return haversine_m(lat, lon, arr[:, 0], arr[:, 1])
+
+
+def _local_xy(arr: np.ndarray) -> np.ndarray:
+    """작은 범위용 등장방형 투영(m). 단순화 허용 오차 비교용"""
+    lat0 = np.radians(arr[:, 0].mean())
+    y = np.radians(arr[:, 0]) * EARTH_RADIUS_M
+    x = np.radians(arr[:, 1]) * EARTH_RADIUS_M * np.cos(lat0)
+    return np.column_stack([x, y])
+
+
+def simplify_mask(latlon: LatLon, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker로 남길 점 마스크(양 끝점은 항상 유지).
+    재귀 대신 같은 깊이의 구간들을 한 번에 처리 → 깊이당 NumPy 연산 몇 번
+    """
+    arr = as_array(latlon)
+    n = len(arr)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    if n < 3 or tolerance_m <= 0:
+        keep[:] = True
+        return keep
+
+    xy = _local_xy(arr)
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    while len(starts):
+        inner = ends - starts - 1
+        ok = inner > 0
+        starts, ends, inner = starts[ok], ends[ok], inner[ok]
+        if not len(starts):
+            break
+        # 모든 구간의 내부 점을 한 배열로: gid = 소속 구간
+        gid = np.repeat(np.arange(len(starts)), inner)
+        first = np.cumsum(inner) - inner
+        idx = starts[gid] + 1 + (np.arange(int(inner.sum())) - first[gid])
+
+        a = xy[starts][gid]
+        seg = xy[ends][gid] - a
+        pts = xy[idx] - a
+        seg_len2 = (seg * seg).sum(axis=1)
+        t = np.zeros(len(idx))
+        nz = seg_len2 > 0
+        t[nz] = np.clip((pts[nz] * seg[nz]).sum(axis=1) / seg_len2[nz], 0.0, 1.0)
+        d = np.hypot(*(pts - seg * t[:, None]).T)  # 선분(끝점 포함)까지 거리
+
+        # 구간별 최대 거리 점(구간은 idx 안에서 연속 → reduceat)
+        dmax = np.maximum.reduceat(d, first)
+        cand = np.flatnonzero(d == dmax[gid])
+        _, pick = np.unique(gid[cand], return_index=True)
+        best = cand[pick]
+        split = d[best] > tolerance_m
+        mid = idx[best][split]
+        keep[mid] = True
+        starts = np.concatenate([starts[split], mid])
+        ends = np.concatenate([mid, ends[split]])
+    return keep
+
+
+def simplify(latlon: LatLon, tolerance_m: float) -> np.ndarray:
+    arr = as_array(latlon)
+    return arr[simplify_mask(arr, tolerance_m)]
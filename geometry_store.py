@@ -0,0 +1,101 @@
+# geometry_store.py
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import course_catalog as cc
+import osm_backend as ob
+from packed_line import PackedLine
+
+# 코스 좌표 저장소(osm_id → {"coords", "segments_coarse", "segments_fine"})
+# 랭킹/필터는 좌표 없는 요약 행으로 하고, 지도에 그릴 코스의 좌표만 여기서 꺼냄
+# 조회 순서: 메모리(LRU) → 로컬 카탈로그 → Overpass(relation id로 한 번에)
+
+STORE_MAX_ITEMS = int(os.getenv("GEOMETRY_STORE_MAX_ITEMS", "2000"))
+
+Geometry = Dict[str, PackedLine]
+
+
+class GeometryStore:
+    def __init__(self, max_items: int = STORE_MAX_ITEMS) -> None:
+        self.max_items = max_items
+        self._items: "OrderedDict[int, Geometry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, osm_id: int, geometry: Geometry) -> None:
+        with self._lock:
+            self._items[osm_id] = geometry
+            self._items.move_to_end(osm_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get(self, osm_id: int) -> Optional[Geometry]:
+        with self._lock:
+            g = self._items.get(osm_id)
+            if g is not None:
+                self._items.move_to_end(osm_id)
+            return g
+
+    def summarize(self, courses: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """전체 코스 dict → 요약 행. 좌표는 저장소에 넣어둠"""
+        out = []
+        for c in courses:
+            summary, geometry = ob.split_course(c)
+            if summary.get("osm_id") is not None:
+                self.put(int(summary["osm_id"]), geometry)
+            out.append(summary)
+        return out
+
+    def load(self, osm_ids: Iterable[int]) -> Dict[int, Geometry]:
+        """osm_id -> 좌표 묶음. 메모리에 없으면 카탈로그, 그래도 없으면 Overpass"""
+        ids = [int(i) for i in dict.fromkeys(osm_ids)]
+        out: Dict[int, Geometry] = {}
+        for i in ids:
+            g = self.get(i)
+            if g is not None:
+                out[i] = g
+
+        missing = [i for i in ids if i not in out]
+        if missing:
+            for i, g in cc.load_geometries(missing).items():
+                self.put(i, g)
+                out[i] = g
+
+        missing = [i for i in ids if i not in out]
+        if missing:
+            for rel in ob.fetch_relations_by_id(missing):
+                c = ob.relation_to_course(rel)
+                if c:
+                    _, g = ob.split_course(c)
+                    self.put(int(rel["id"]), g)
+                    out[int(rel["id"])] = g
+        return out
+
+
+_default: Optional[GeometryStore] = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> GeometryStore:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = GeometryStore()
+        return _default
+
+
+def course_summaries(
+    bbox: Tuple[float, float, float, float], max_relations: int = 50
+) -> List[Dict[str, Any]]:
+    """build_courses의 요약 행 버전(좌표는 default_store에)"""
+    return default_store().summarize(ob.build_courses(bbox, max_relations=max_relations))
+
+
+def load_geometries(osm_ids: Iterable[int]) -> Dict[int, Geometry]:
+    return default_store().load(osm_ids)
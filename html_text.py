@@ -0,0 +1,73 @@
+# html_text.py
+from __future__ import annotations
+
+import html
+import re
+
+# 네이버 블로그 PostView HTML -> 본문 텍스트 (문서를 한 번만 훑음)
+# 1) 본문 컨테이너(스마트에디터 se-main-container, 구버전 postViewArea) 시작 위치 검색
+# 2) 거기서부터 div 열림/닫힘만 세어 컨테이너 끝 찾기
+# 3) 컨테이너 구간만 토큰화: script/style 등은 버리고, 블록 태그 경계는 줄바꿈(문장 분리용)
+# 컨테이너가 없으면 문서 전체를 3)으로 처리
+# (html.parser는 태그마다 파이썬 코드가 돌아 기존 정규식 방식보다 느려서 컴파일된 토크나이저 사용)
+
+SKIP_TAGS = ("script", "style", "noscript", "template", "iframe", "svg")
+BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+        "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+        "header", "hr", "li", "ol", "p", "pre", "section", "table", "td", "th",
+        "tr", "ul",
+    }
+)
+
+_CONTAINER_RE = re.compile(
+    r"""<div\b[^>]*?(?:class\s*=\s*["'][^"']*\bse-main-container\b|id\s*=\s*["']postViewArea["'])[^>]*>""",
+    re.I,
+)
+_SKIP = "|".join(SKIP_TAGS)
+_DIV_RE = re.compile(rf"<({_SKIP})\b.*?</\1\s*>|<!--.*?-->|<(/?)div\b[^>]*>", re.I | re.S)
+_TOKEN_RE = re.compile(
+    rf"<({_SKIP})\b.*?</\1\s*>|<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>",
+    re.I | re.S,
+)
+_WS_RE = re.compile(r"[ \t\r\f\v\u00a0\u200b\ufeff]+")
+_NL_RE = re.compile(r" ?\n[ \n]*")
+
+
+def find_post_body(doc: str) -> tuple[int, int] | None:
+    """본문 컨테이너의 (시작, 끝) 오프셋. 없으면 None"""
+    m = _CONTAINER_RE.search(doc)
+    if not m:
+        return None
+    depth = 1
+    for t in _DIV_RE.finditer(doc, m.end()):
+        if t.group(1):  # script/style 등: div 문자열이 있어도 무시
+            continue
+        if t.group(0).startswith("<!--"):
+            continue
+        depth += -1 if t.group(2) else 1
+        if depth == 0:
+            return m.end(), t.start()
+    return m.end(), len(doc)
+
+
+def _replace_tag(m: re.Match) -> str:
+    if m.group(1):
+        return " "
+    tag = m.group(3)
+    if tag and tag.lower() in BLOCK_TAGS:
+        return "\n"
+    return " " if tag else ""
+
+
+def normalize_text(text: str) -> str:
+    text = _WS_RE.sub(" ", text)
+    text = _NL_RE.sub("\n", text)
+    return text.strip()
+
+
+def html_to_text(doc: str) -> str:
+    span = find_post_body(doc)
+    part = doc[span[0] : span[1]] if span else doc
+    return normalize_text(html.unescape(_TOKEN_RE.sub(_replace_tag, part)))
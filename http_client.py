@@ -0,0 +1,94 @@
+# http_client.py
+from __future__ import annotations
+
+import os
+import threading
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 외부 API 공용 HTTP 클라이언트
+# - 호스트별 requests.Session(keep-alive 커넥션 풀) 재사용
+# - gzip/deflate(+brotli 모듈이 있으면 br) 압축 응답 요청
+# - 풀 크기/타임아웃은 환경변수로 조정
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+HTTP_CONNECT_TIMEOUT_S = float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "5"))
+HTTP_READ_TIMEOUT_S = float(os.getenv("HTTP_READ_TIMEOUT_S", "30"))
+
+
+def _accept_encoding() -> str:
+    # urllib3는 brotli/brotlicffi가 설치돼 있을 때만 br을 풀 수 있음
+    for mod in ("brotli", "brotlicffi"):
+        try:
+            __import__(mod)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+Timeout = Union[float, Tuple[float, float], None]
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _host_key(url: str) -> str:
+    u = urllib.parse.urlsplit(url)
+    return f"{u.scheme}://{u.netloc}".lower()
+
+
+def session_for(url: str) -> requests.Session:
+    """url 호스트 전용 세션(없으면 생성)"""
+    key = _host_key(url)
+    with _lock:
+        s = _sessions.get(key)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=0,
+            )
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            _sessions[key] = s
+        return s
+
+
+def _timeout(timeout: Timeout) -> Timeout:
+    if timeout is None:
+        return (HTTP_CONNECT_TIMEOUT_S, HTTP_READ_TIMEOUT_S)
+    if isinstance(timeout, (int, float)):
+        return (min(HTTP_CONNECT_TIMEOUT_S, float(timeout)), float(timeout))
+    return timeout
+
+
+def request(
+    method: str, url: str, timeout: Timeout = None, **kwargs: Any
+) -> requests.Response:
+    return session_for(url).request(method, url, timeout=_timeout(timeout), **kwargs)
+
+
+def get(url: str, timeout: Timeout = None, **kwargs: Any) -> requests.Response:
+    return request("GET", url, timeout=timeout, **kwargs)
+
+
+def post(url: str, timeout: Timeout = None, **kwargs: Any) -> requests.Response:
+    return request("POST", url, timeout=timeout, **kwargs)
+
+
+def close_all(hosts: Optional[list[str]] = None) -> None:
+    with _lock:
+        keys = list(_sessions) if hosts is None else [_host_key(h) for h in hosts]
+        for k in keys:
+            s = _sessions.pop(k, None)
+            if s is not None:
+                s.close()
@@ -0,0 +1,101 @@
+# jsonl_store.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Callable, Iterator, Optional
+
+# 크롤 결과 스트리밍 저장: 처리된 글마다 한 줄(compact JSON)씩 바로 append
+# - 중간에 죽어도 그때까지의 결과가 남음 → read_jsonl로 읽어 이어서 수집(resume)
+# - resume으로 같은 항목이 다시 기록될 수 있음 → read_latest로 키별 마지막 줄만
+# - compact_jsonl: 기존 {"query","count","results"} 형태 JSON 문서로 변환
+
+
+def jsonl_path_for(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + ".jsonl"
+
+
+class JsonlWriter:
+    def __init__(self, path: str, append: bool = False) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        if append:
+            _drop_partial_line(path)
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._f.write(line + "\n")
+            self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _drop_partial_line(path: str) -> None:
+    # 쓰다 끊긴 마지막 줄(개행 없음)은 잘라냄
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def iter_jsonl(path: str) -> Iterator[dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 끊긴 줄
+
+
+def read_jsonl(path: str) -> list[dict[str, Any]]:
+    return list(iter_jsonl(path))
+
+
+def read_latest(
+    path: str, key: Callable[[dict[str, Any]], Any]
+) -> list[dict[str, Any]]:
+    """key가 같은 줄이 여럿이면 나중 것만(처음 나온 순서 유지)"""
+    latest: dict[Any, dict[str, Any]] = {}
+    for r in iter_jsonl(path):
+        latest[key(r)] = r
+    return list(latest.values())
+
+
+def compact_jsonl(
+    jsonl_path: str,
+    json_path: str,
+    header: dict[str, Any],
+    sort_key: Optional[Callable[[dict[str, Any]], Any]] = None,
+    key: Optional[Callable[[dict[str, Any]], Any]] = None,
+) -> list[dict[str, Any]]:
+    """JSONL -> {**header, "count", "results"} JSON 문서. key가 있으면 키별 마지막 줄만"""
+    records = read_latest(jsonl_path, key) if key is not None else read_jsonl(jsonl_path)
+    if sort_key is not None:
+        records.sort(key=sort_key)
+    doc = {**header, "count": len(records), "results": records}
+    tmp = f"{json_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, json_path)
+    return records
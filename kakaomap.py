@@ -5,6 +5,8 @@ import os
 import requests
 import streamlit as st
 
+import http_client
+
 KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY", "")
 KAKAO_KEYWORD_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
 
@@ -37,7 +39,7 @@ def kakao_keyword_search(
         params["radius"] = radius
 
     headers = {"Authorization": f"KakaoAK {key}"}
-    r = requests.get(KAKAO_KEYWORD_URL, params=params, headers=headers, timeout=10)
+    r = http_client.get(KAKAO_KEYWORD_URL, params=params, headers=headers, timeout=10)
     try:
         r.raise_for_status()
     except requests.HTTPError as e:
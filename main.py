@@ -1,15 +1,26 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+import os
+import threading
+
 import altair as alt
 import pandas as pd
-import requests
 import streamlit as st
 import folium
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit_folium import st_folium
 
+import async_backend as ab
+import course_catalog as cc
+import course_index as ci
+import geometry_store as gs
 import osm_backend as ob
+import poi_index as poi
+import spatial_index as si
 from kakaomap import kakao_keyword_search
+from weather import openweather_current
 
 st.set_page_config(page_title="트레킹 코스 추천", page_icon="🥾", layout="wide")
 st.title("🥾 트레킹 코스 추천")
@@ -20,17 +31,7 @@ OPENWEATHER_API_KEY = st.secrets.get("OPENWEATHER_API_KEY", "")
 
 @st.cache_data(ttl=600)  # 10분 캐시
 def get_weather_openweather(lat: float, lon: float, api_key: str):
-    url = "https://api.openweathermap.org/data/2.5/weather"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": api_key,
-        "units": "metric",
-        "lang": "kr",
-    }
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return openweather_current(lat, lon, api_key)
 
 
 def judge_outdoor(w):
@@ -117,11 +118,28 @@ def judge_outdoor(w):
 
 
 # ====== Cached backend ======
+@st.cache_resource
+def catalog_spatial_index(built_at: float) -> si.CourseSpatialIndex:
+    # 카탈로그 요약 행 전체를 한 번만 읽어 메모리 격자 색인으로(재빌드되면 built_at이 바뀌어 새로 만듦)
+    return si.CourseSpatialIndex(cc.all_summaries())
+
+
 @st.cache_data(ttl=60 * 60)
 def cached_courses(
     bbox: Tuple[float, float, float, float], max_relations: int
 ) -> pd.DataFrame:
-    courses = ob.build_courses(bbox, max_relations=max_relations)
+    # 좌표 없는 요약 행만(osm_id, 이름, 거리, 점수, 시작/끝, bbox) → 필터/정렬이 가벼움
+    # 좌표는 Top-K를 정한 뒤 geometry_store에서 osm_id로 꺼냄
+    # 로컬 카탈로그(course_catalog.py)가 bbox를 덮으면 Overpass 없이 공간 색인으로 조회
+    # 오래됐으면 일단 그대로 쓰고 백그라운드에서 다시 빌드
+    info = cc.catalog_info()
+    if info and cc.covers(bbox):
+        if not cc.covers(bbox, max_age_s=cc.CATALOG_MAX_AGE_S):
+            cc.refresh_in_background()
+        index = catalog_spatial_index(info["built_at"])
+        courses = ob.rank_courses(index.intersecting(bbox), limit=max_relations)
+    else:
+        courses = gs.course_summaries(bbox, max_relations=max_relations)
     if not courses:
         return pd.DataFrame()
     df = pd.DataFrame(courses)
@@ -131,14 +149,23 @@ def cached_courses(
     return df
 
 
+@st.cache_data(ttl=60 * 60)
+def cached_popularity(path: str, mtime: float) -> Dict[str, int]:
+    # mtime이 키에 들어가므로 course_index.py로 다시 만들면 바로 반영
+    return ci.load_popularity(path)
+
+
 @st.cache_data(ttl=60 * 20)
-def cached_places(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
-    return ob.places_near(lat, lon, radius_m)
+def cached_places_many(
+    centers: Tuple[Tuple[float, float, int], ...]
+) -> List[List[Dict[str, Any]]]:
+    return ob.places_near_many(list(centers))
 
 
 @st.cache_data(ttl=60 * 60)
-def cached_elevation_profile(coords_latlon, ors_api_key: str):
-    return ob.elevation_profile(coords_latlon, api_key=ors_api_key)
+def cached_elevation_profile(course_key: str, _coords, ors_api_key: str):
+    # 캐시 키는 course_key(relation id + 버전), 좌표(_coords)는 해시하지 않음
+    return ob.elevation_profile(_coords, api_key=ors_api_key)
 
 
 @st.cache_data(ttl=60 * 10)
@@ -225,6 +252,7 @@ with st.sidebar:
 
     if st.button("🔄 캐시 초기화", use_container_width=True):
         st.cache_data.clear()
+        ob.clear_overpass_cache()  # 디스크 캐시도 비워야 Overpass에서 다시 받음
         st.success("캐시 초기화 완료! 새로고침하면 다시 수집합니다.")
 
 
@@ -249,6 +277,13 @@ if df.empty:
     )
     st.stop()
 
+# 블로그 언급 인기도(course_index.py가 미리 계산) → 랭킹 가산점
+pop_path = ci.POPULARITY_JSON
+pop_mtime = os.path.getmtime(pop_path) if os.path.exists(pop_path) else 0.0
+popularity = cached_popularity(pop_path, pop_mtime)
+df["blog_posts"] = df["name"].map(popularity).fillna(0).astype(int)
+df["rank_score"] = df["score"] + ci.popularity_boost(df["blog_posts"])
+
 # 난이도 필터
 df_use = df.copy()
 if diff_filter != "전체":
@@ -273,22 +308,116 @@ if df_use.empty:
     st.info("선택한 난이도에서 후보가 없습니다. 다른 난이도를 선택해 보세요.")
     st.stop()
 
-df_use = df_use.sort_values("score", ascending=False).head(topk).reset_index(drop=True)
-df_chart = df_use[["name", "difficulty", "distance_km", "members", "score"]].copy()
+df_use = df_use.sort_values("rank_score", ascending=False).head(topk).reset_index(drop=True)
+df_chart = df_use[["label", "difficulty", "distance_km", "members", "blog_posts", "score"]].copy()
+
+# 지도에 그릴 Top-K 코스 좌표만 조회(메모리 → 카탈로그 → Overpass)
+# 카탈로그에 없는 코스는 Overpass로 받으므로 429/네트워크 오류 가능 → 경로 없이 계속
+try:
+    geometries = gs.load_geometries(int(i) for i in df_use["osm_id"])
+except Exception as e:
+    st.error(
+        "코스 경로를 불러오지 못했습니다(요청 제한 또는 일시 오류). 지도에 경로 없이 표시합니다."
+    )
+    st.exception(e)
+    geometries = {}
 
 # ====== (중요) 선택 코스를 지도/차트보다 먼저 고르게 해서,
 #       날씨를 "코스 후보 생성완료"와 "추천 코스 지도" 사이에 표시 가능하게 함 ======
-course_names = df_use["name"].tolist()
-if not course_names:
+# 선택은 course_id(OSM relation id)로: 같은 이름의 다른 구간도 구분, 화면에는 label
+course_ids = df_use["course_id"].tolist()
+if not course_ids:
     st.info("선택한 조건에 맞는 코스가 없습니다.")
     st.stop()
+course_labels = dict(zip(df_use["course_id"], df_use["label"]))
 
 sel_key = "selected_course"
-if sel_key in st.session_state and st.session_state[sel_key] not in course_names:
+if sel_key in st.session_state and st.session_state[sel_key] not in course_ids:
     del st.session_state[sel_key]
 
-selected = st.selectbox("상세로 볼 코스 선택", course_names, index=0, key=sel_key)
-row = df_use[df_use["name"] == selected].iloc[0].to_dict()
+selected = st.selectbox(
+    "상세로 볼 코스 선택",
+    course_ids,
+    index=0,
+    key=sel_key,
+    format_func=lambda cid: course_labels.get(cid, cid),
+)
+row = df_use[df_use["course_id"] == selected].iloc[0].to_dict()
+
+# ====== 선택 코스 부가 조회(Kakao/날씨/고도/주변 장소)를 동시에 실행 ======
+#       각 섹션은 아래에서 결과만 꺼내 씀 → 페이지 시간 = 가장 느린 호출
+kakao_key = st.secrets.get("KAKAO_REST_API_KEY", "") or st.secrets.get(
+    "KAKAO_REST_KEY", ""
+)
+ors_key = st.secrets.get("ORS_API_KEY", "")
+end_lat, end_lon = float(row["end_lat"]), float(row["end_lon"])
+kakao_cache_key = f"{selected}:{end_lat:.6f},{end_lon:.6f}:{kakao_radius_m}:{kakao_size}"
+
+# Top-K 코스 종료점 주변 장소를 Overpass 한 번에(선택을 바꿔도 같은 캐시)
+place_centers = tuple(
+    (round(float(la), 6), round(float(lo), 6), int(near_radius_m))
+    for la, lo in zip(df_use["end_lat"], df_use["end_lon"])
+)
+# 로컬 POI 색인(poi_index.py)이 덮으면 메모리에서 바로(반경을 바꿔도 요청/캐시 키 없음)
+if poi.covers(place_centers):
+    if not poi.covers(place_centers, max_age_s=poi.POI_MAX_AGE_S):
+        poi.refresh_in_background()
+    places_call = partial(poi.places_near_many, place_centers)
+else:
+    places_call = partial(cached_places_many, place_centers)
+lookup_calls: Dict[str, Callable[[], Any]] = {"places": places_call}
+if show_kakao and kakao_key:
+    for name, query, category in (
+        ("kakao_food", "맛집", "FD6"),
+        ("kakao_cafe", "카페", "CE7"),
+    ):
+        lookup_calls[name] = partial(
+            cached_kakao_places,
+            query=query,
+            category=category,
+            x=end_lon,
+            y=end_lat,
+            radius_m=int(kakao_radius_m),
+            size=int(kakao_size),
+            api_key=kakao_key,
+            cache_key=kakao_cache_key,
+        )
+if OPENWEATHER_API_KEY:
+    lookup_calls["weather"] = partial(
+        get_weather_openweather,
+        float(row["start_lat"]),
+        float(row["start_lon"]),
+        OPENWEATHER_API_KEY,
+    )
+row_geometry = geometries.get(int(row["osm_id"]))
+if show_elevation and ors_key and row_geometry:
+    lookup_calls["elevation"] = partial(
+        cached_elevation_profile, ob.course_key(row), row_geometry["coords"], ors_key
+    )
+
+
+def _with_script_ctx(fn: Callable[[], Any]) -> Callable[[], Any]:
+    # 워커 스레드에서도 st.cache_data가 현재 세션 컨텍스트를 쓰도록
+    ctx = get_script_run_ctx()
+
+    def run() -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn()
+
+    return run
+
+
+lookups = ab.run(
+    ab.gather_calls({k: _with_script_ctx(f) for k, f in lookup_calls.items()})
+)
+
+
+def lookup_result(name: str) -> Any:
+    res = lookups[name]
+    if isinstance(res, BaseException):
+        raise res
+    return res
+
 
 # ====== Kakao places (near selected course end) ======
 kakao_food: List[Dict[str, str]] = []
@@ -296,35 +425,12 @@ kakao_cafe: List[Dict[str, str]] = []
 kakao_center: Tuple[float, float] | None = None
 if "show_kakao" in locals() and show_kakao:
     try:
-        kakao_key = st.secrets.get("KAKAO_REST_API_KEY", "") or st.secrets.get(
-            "KAKAO_REST_KEY", ""
-        )
         if not kakao_key:
             st.info("KAKAO_REST_API_KEY가 없어 Kakao 마커를 표시할 수 없습니다.")
         else:
-            end_lon = float(row["end_lon"])
-            end_lat = float(row["end_lat"])
             kakao_center = (end_lat, end_lon)
-            kakao_food = cached_kakao_places(
-                query="맛집",
-                category="FD6",
-                x=end_lon,
-                y=end_lat,
-                radius_m=int(kakao_radius_m),
-                size=int(kakao_size),
-                api_key=kakao_key,
-                cache_key=f"{selected}:{end_lat:.6f},{end_lon:.6f}:{kakao_radius_m}:{kakao_size}",
-            )
-            kakao_cafe = cached_kakao_places(
-                query="카페",
-                category="CE7",
-                x=end_lon,
-                y=end_lat,
-                radius_m=int(kakao_radius_m),
-                size=int(kakao_size),
-                api_key=kakao_key,
-                cache_key=f"{selected}:{end_lat:.6f},{end_lon:.6f}:{kakao_radius_m}:{kakao_size}",
-            )
+            kakao_food = lookup_result("kakao_food")
+            kakao_cafe = lookup_result("kakao_cafe")
     except Exception as e:
         st.warning("Kakao Local 호출에 실패했습니다.")
         st.exception(e)
@@ -335,11 +441,8 @@ st.caption("🌦️ 오늘 날씨/야외 적합도 (선택 코스 시작점 기
 if not OPENWEATHER_API_KEY:
     st.info("OPENWEATHER_API_KEY가 Secrets에 없어서 날씨를 표시할 수 없어요.")
 else:
-    # ✅ 시작점 기준 고정
-    wlat, wlon = float(row["start_lat"]), float(row["start_lon"])
-
     try:
-        w = get_weather_openweather(wlat, wlon, OPENWEATHER_API_KEY)
+        w = lookup_result("weather")  # ✅ 시작점 기준 고정
         judge = judge_outdoor(w)
 
         if judge["level"] == "good":
@@ -394,22 +497,28 @@ with col_map:
         "#fdcb6e",
     ]
 
-    selected_name = row["name"]
+    selected_id = row["course_id"]
 
     for i, r in df_use.iterrows():
-        latlon = r["coords"]
+        geom = geometries.get(int(r["osm_id"]))
+        if geom is None:
+            continue
+        is_selected = r["course_id"] == selected_id
+        # 단순화 단계: 선택 코스만 상세, 나머지는 개요용(HTML에 들어가는 점 수 감소)
+        # 끊긴 코스는 여러 구간(MultiLineString)으로
+        latlon = (geom["segments_fine"] if is_selected else geom["segments_coarse"]).segments()
         color = colors[i % len(colors)]
 
         # 선택 코스 강조
-        weight = 8 if r["name"] == selected_name else 6
-        opacity = 0.95 if r["name"] == selected_name else 0.85
+        weight = 8 if is_selected else 6
+        opacity = 0.95 if is_selected else 0.85
 
         folium.PolyLine(
             latlon,
             color=color,
             weight=weight,
             opacity=opacity,
-            tooltip=f"{i+1}번 {r['name']}",
+            tooltip=f"{i+1}번 {r['label']}",
         ).add_to(m)
 
         folium.Marker(
@@ -465,16 +574,21 @@ with col_map:
 
 with col_panel:
     st.subheader(f"🏅 추천 Top {len(df_use)}")
-    show_cols = ["name", "difficulty", "distance_km", "members", "score"]
-    st.dataframe(df_use[show_cols], use_container_width=True, hide_index=True)
+    show_cols = ["label", "difficulty", "distance_km", "members", "blog_posts", "score"]
+    df_panel = df_use
+    if not isinstance(lookups["places"], BaseException):
+        # 종료점 주변 카페/바 수(일괄 조회 결과라 추가 요청 없음)
+        df_panel = df_use.assign(after_places=[len(p) for p in lookups["places"]])
+        show_cols.append("after_places")
+    st.dataframe(df_panel[show_cols], use_container_width=True, hide_index=True)
 
     chart = (
         alt.Chart(df_chart)
         .mark_bar()
         .encode(
-            x=alt.X("name:N", title="코스"),
+            x=alt.X("label:N", title="코스"),
             y=alt.Y("distance_km:Q", title="거리(km)"),
-            tooltip=["name", "difficulty", "distance_km", "members", "score"],
+            tooltip=["label", "difficulty", "distance_km", "members", "blog_posts", "score"],
         )
     )
     st.altair_chart(chart, use_container_width=True)
@@ -485,12 +599,14 @@ st.divider()
 st.subheader("⛰️ 고도 그래프")
 
 if show_elevation:
-    ors_key = st.secrets.get("ORS_API_KEY", "")
     if not ors_key:
         st.warning("ORS_API_KEY가 Secrets에 없습니다. (Settings → Secrets)")
+    elif "elevation" not in lookups:
+        # 선택 코스 경로를 불러오지 못해 고도 요청을 만들지 않음
+        st.info("선택 코스의 경로가 없어 고도 그래프를 그릴 수 없어요.")
     else:
         try:
-            prof = cached_elevation_profile(row["coords"], ors_key)
+            prof = lookup_result("elevation")
         except Exception as e:
             st.error("ORS 고도 요청 중 오류가 발생했습니다. (키/쿼터/네트워크 확인)")
             st.exception(e)
@@ -539,9 +655,7 @@ else:
 # ====== After trekking 추천 ======
 st.subheader("☕/🍺 트레킹 후 추천 TOP 10 (종료점 기준)")
 try:
-    places = cached_places(
-        float(row["end_lat"]), float(row["end_lon"]), int(near_radius_m)
-    )
+    places = list(lookup_result("places")[course_ids.index(selected)])
 except Exception as e:
     st.error(
         "주변 장소 조회 중 Overpass 제한/오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
@@ -6,12 +6,13 @@ import json
 import altair as alt
 import folium
 import pandas as pd
-import requests
 import streamlit as st
 import streamlit.components.v1 as components
 from streamlit_folium import st_folium
 
+import http_client
 import osm_backend as ob
+import poi_index as poi
 from kakaomap import kakao_keyword_search
 
 st.set_page_config(page_title="트레킹 코스 추천", page_icon="🥾", layout="wide")
@@ -31,7 +32,7 @@ def get_weather_openweather(lat: float, lon: float, api_key: str):
         "units": "metric",
         "lang": "kr",
     }
-    r = requests.get(url, params=params, timeout=10)
+    r = http_client.get(url, params=params, timeout=10)
     r.raise_for_status()
     return r.json()
 
@@ -136,7 +137,8 @@ def cached_courses(
 
 @st.cache_data(ttl=60 * 20)
 def cached_places(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
-    return ob.places_near(lat, lon, radius_m)
+    # 로컬 POI 색인(poi_index.py)이 있으면 메모리에서, 없으면 Overpass
+    return poi.places_near(lat, lon, radius_m)
 
 
 @st.cache_data(ttl=60 * 60)
@@ -195,6 +197,7 @@ with st.sidebar:
 
     if st.button("🔄 캐시 초기화", use_container_width=True):
         st.cache_data.clear()
+        ob.clear_overpass_cache()  # 디스크 캐시도 비워야 Overpass에서 다시 받음
         st.success("캐시 초기화 완료! 새로고침하면 다시 수집합니다.")
 
 
@@ -233,8 +236,14 @@ df_chart = df_use[["name", "difficulty", "distance_km", "members", "score"]].cop
 
 # ====== (중요) 선택 코스를 지도/차트보다 먼저 고르게 해서,
 #       날씨를 "코스 후보 생성완료"와 "추천 코스 지도" 사이에 표시 가능하게 함 ======
-selected = st.selectbox("상세로 볼 코스 선택", df_use["name"].tolist(), index=0)
-row = df_use[df_use["name"] == selected].iloc[0].to_dict()
+course_labels = dict(zip(df_use["course_id"], df_use["label"]))
+selected = st.selectbox(
+    "상세로 볼 코스 선택",
+    df_use["course_id"].tolist(),
+    index=0,
+    format_func=lambda cid: course_labels.get(cid, cid),
+)
+row = df_use[df_use["course_id"] == selected].iloc[0].to_dict()
 
 # ====== Weather / Outdoor score (원하는 위치) ======
 if show_weather:
@@ -304,15 +313,15 @@ with col_map:
         "#fdcb6e",
     ]
 
-    selected_name = row["name"]
+    selected_id = row["course_id"]
 
     for i, r in df_use.iterrows():
-        latlon = r["coords"]
+        latlon = r["coords"].segments()
         color = colors[i % len(colors)]
 
         # 선택 코스는 더 두껍게 강조
-        weight = 8 if r["name"] == selected_name else 6
-        opacity = 0.95 if r["name"] == selected_name else 0.85
+        weight = 8 if r["course_id"] == selected_id else 6
+        opacity = 0.95 if r["course_id"] == selected_id else 0.85
 
         folium.PolyLine(
             latlon,
@@ -0,0 +1,160 @@
+# naver_url.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import urllib.parse
+from functools import lru_cache
+from typing import Callable, Optional
+
+import requests
+
+import http_client
+
+# 네이버 블로그 URL 정규화
+# 어떤 형태의 링크든 (blogId, logNo)로 풀어서 가장 가벼운 본문 엔드포인트로 바로 보냄
+# (blog.naver.com/<id>/<no>는 본문 없는 iframe 껍데기라 한 번 더 요청해야 함)
+#
+# 지원 형태
+# - blog.naver.com/<id>/<no>, m.blog.naver.com/<id>/<no>
+# - (m.)blog.naver.com/PostView.naver|nhn?blogId=..&logNo=.. (파라미터 순서 무관)
+# - blog.naver.com/<id>?Redirect=Log&logNo=<no>, PostList 등 logNo 쿼리가 붙은 형태
+# - <id>.blog.me/<no>
+# - 리다이렉트 링크(url=/u= 파라미터에 원래 주소가 들어있는 경우)
+# - 그 밖의 네이버 주소(in.naver.com 등)는 한 번 요청해서 리다이렉트로 해석
+#   (최종 주소가 블로그 호스트일 때만 본문 속 blogId·logNo도 봄), 결과는 캐시(파일 저장 가능)
+#   요청은 호출 측 fetch로(크롤러는 crawler.fetch_response: User-Agent + 호스트별 토큰 버킷)
+
+POST_ENDPOINT = "https://m.blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}"
+
+_PATH_RE = re.compile(r"^/([A-Za-z0-9_\-]+)/(\d+)/?$")
+_BLOG_ME_RE = re.compile(r"^([A-Za-z0-9_\-]+)\.blog\.me$")
+_IN_HTML_RE = re.compile(
+    r"blogId=([A-Za-z0-9_\-]+)(?:&amp;|&)logNo=(\d+)"
+    r"|blog\.naver\.com/([A-Za-z0-9_\-]+)/(\d+)"
+)
+_REDIRECT_PARAMS = ("url", "u", "target", "returl")
+_NAVER_HOST_RE = re.compile(r"(^|\.)(naver\.com|blog\.me|naver\.me)$")
+_BLOG_HOST_RE = re.compile(r"(^|\.)(blog\.naver\.com|blog\.me)$")
+
+Fetch = Callable[[str], requests.Response]
+
+_resolved: dict[str, Optional[tuple[str, str]]] = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
+def parse_post_ref(url: str) -> Optional[tuple[str, str]]:
+    """요청 없이 URL만으로 (blogId, logNo). 모르면 None"""
+    try:
+        u = urllib.parse.urlsplit(url.strip())
+    except ValueError:
+        return None
+    host = u.netloc.lower().split(":")[0]
+    qs = urllib.parse.parse_qs(u.query)
+
+    if host.endswith("blog.naver.com"):
+        blog_id = (qs.get("blogId") or [""])[0]
+        log_no = (qs.get("logNo") or [""])[0]
+        if not blog_id:
+            # blog.naver.com/<id>?Redirect=Log&logNo=<no>
+            m = re.match(r"^/([A-Za-z0-9_\-]+)/?$", u.path)
+            if m and m.group(1) not in {"PostView.naver", "PostView.nhn", "PostList.naver"}:
+                blog_id = m.group(1)
+        if blog_id and log_no.isdigit():
+            return blog_id, log_no
+        m = _PATH_RE.match(u.path)
+        if m:
+            return m.group(1), m.group(2)
+
+    m = _BLOG_ME_RE.match(host)
+    if m:
+        no = u.path.strip("/")
+        if no.isdigit():
+            return m.group(1), no
+
+    for k in _REDIRECT_PARAMS:
+        inner = (qs.get(k) or [""])[0]
+        if inner.startswith("http"):
+            return parse_post_ref(inner)
+    return None
+
+
+def post_endpoint(blog_id: str, log_no: str) -> str:
+    return POST_ENDPOINT.format(blog_id=blog_id, log_no=log_no)
+
+
+def _default_fetch(url: str) -> requests.Response:
+    return http_client.get(url, timeout=10, allow_redirects=True)
+
+
+def _resolve_remote(url: str, fetch: Fetch) -> Optional[tuple[str, str]]:
+    res = fetch(url)
+    for r in [*res.history, res]:
+        for cand in (r.url, r.headers.get("Location", "")):
+            ref = parse_post_ref(cand) if cand else None
+            if ref:
+                return ref
+    # 본문 검색은 블로그 페이지에서만(다른 네이버 페이지의 아무 blogId/logNo를 잡지 않도록)
+    host = urllib.parse.urlsplit(res.url or url).netloc.lower().split(":")[0]
+    if not _BLOG_HOST_RE.search(host):
+        return None
+    m = _IN_HTML_RE.search(res.text[:200_000])
+    if m:
+        return (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+    return None
+
+
+def resolve_post_ref(
+    url: str, allow_network: bool = True, fetch: Optional[Fetch] = None
+) -> Optional[tuple[str, str]]:
+    ref = parse_post_ref(url)
+    if ref or not allow_network:
+        return ref
+
+    host = urllib.parse.urlsplit(url).netloc.lower().split(":")[0]
+    if not _NAVER_HOST_RE.search(host):
+        return None
+
+    with _lock:
+        if url in _resolved:
+            return _resolved[url]
+    try:
+        ref = _resolve_remote(url, fetch or _default_fetch)
+    except Exception:
+        return None  # 네트워크 실패는 캐시하지 않음
+    with _lock:
+        _resolved[url] = ref
+    return ref
+
+
+def resolve_post_url(
+    url: str, allow_network: bool = True, fetch: Optional[Fetch] = None
+) -> str:
+    """본문을 받을 URL. 해석 못 하면 원래 링크. fetch: 해석 요청에 쓸 함수(url -> Response)"""
+    ref = resolve_post_ref(url, allow_network=allow_network, fetch=fetch)
+    return post_endpoint(*ref) if ref else url
+
+
+def load_cache(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    with _lock:
+        for k, v in data.items():
+            _resolved[k] = tuple(v) if v else None
+
+
+def save_cache(path: str) -> None:
+    with _lock:
+        data = {k: list(v) if v else None for k, v in _resolved.items()}
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
@@ -2,10 +2,18 @@
 from __future__ import annotations
 
 import math
-import time
-from typing import Any, Dict, List, Optional, Tuple
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import requests
+import numpy as np
+
+import geo
+import http_client
+import overpass_cache
+import overpass_client
+import spatial_index
+import stitch
+from packed_line import PackedLine
 
 UA = {
     "User-Agent": (
@@ -14,7 +22,7 @@ UA = {
     )
 }
 
-# Overpass 공용 서버(429 대비 로테이션)
+# Overpass 공용 서버(429 대비 hedging/로테이션)
 OVERPASS_URLS = [
     "https://overpass-api.de/api/interpreter",
     "https://overpass.kumi.systems/api/interpreter",
@@ -25,6 +33,20 @@ OVERPASS_URLS = [
 ORS_ELEVATION_LINE_URL = "https://api.openrouteservice.org/elevation/line"
 ORS_MAX_VERTICES = 2000
 
+# 같은 이름 relation이 같은 코스(중복)인지 판단 기준: 시작·끝점 거리, 길이 비율
+DUP_ENDPOINT_M = 100.0
+DUP_DISTANCE_RATIO = 0.05
+
+# 트레킹 후 장소(amenity)
+PLACE_AMENITIES = ("cafe", "bar", "pub")
+
+# 코스 dict 중 좌표 값(요약 행에서는 빼고 osm_id로 따로 보관)
+GEOMETRY_KEYS = ("coords", "segments_coarse", "segments_fine")
+
+# 지도 표시용 단순화 단계(Douglas-Peucker 허용 오차 m)
+# coarse: 추천 코스 전체 보기, fine: 선택한 코스 상세
+SIMPLIFY_LEVELS = {"coarse": 25.0, "fine": 4.0}
+
 
 def bbox_from_center(
     lat: float, lon: float, radius_km: float
@@ -46,14 +68,7 @@ def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 
 
 def polyline_length_km(latlon: List[Tuple[float, float]]) -> float:
-    if len(latlon) < 2:
-        return 0.0
-    dist = 0.0
-    for i in range(1, len(latlon)):
-        dist += haversine_m(
-            latlon[i - 1][0], latlon[i - 1][1], latlon[i][0], latlon[i][1]
-        )
-    return dist / 1000.0
+    return geo.polyline_length_m(latlon) / 1000.0
 
 
 def _safe_get(d: Dict[str, Any], k: str, default: str = "") -> str:
@@ -88,63 +103,241 @@ def difficulty_label(sac_hint: str, distance_km: float) -> str:
     return "어려움"
 
 
+_overpass = overpass_client.OverpassClient(OVERPASS_URLS, headers=UA)
+
+
 def overpass_post(
-    query: str, timeout: int = 60, max_retries: int = 3
+    query: str,
+    timeout: int = 60,
+    max_retries: int = 3,
+    use_cache: bool = True,
+    hedge: bool = True,
 ) -> Dict[str, Any]:
     """
-    429 대응:
-    - 429면 백오프 + Retry-After(있으면 반영)
-    - 서버 로테이션
+    디스크 캐시(overpass_cache) 우선, 없으면 서버 요청.
+    캐시를 열 수 없거나 읽다 실패하면(읽기 전용 FS, 잠김, 손상 등) 바로 요청.
+    서버 요청은 미러 hedging(overpass_client): 429/오류/지연 시 다음 미러.
+    remark 오류(시간 초과/메모리 부족) 응답은 OverpassRemarkError(캐시에도 저장 안 함).
     """
-    last_err: Exception | None = None
 
-    for base in OVERPASS_URLS:
-        wait_s = 2.0
-        for _ in range(max_retries):
+    def fetch() -> Dict[str, Any]:
+        data = _overpass.post(
+            query, timeout=timeout, max_retries=max_retries, hedge=hedge
+        )
+        remark = overpass_client.remark_error(data)
+        if remark:
+            raise overpass_client.OverpassRemarkError("overpass", remark)
+        return data
+
+    if use_cache:
+        try:
+            cache = overpass_cache.default_cache()
+        except Exception:
+            cache = None
+        if cache is not None:
             try:
-                r = requests.post(
-                    base, data=query.encode("utf-8"), headers=UA, timeout=timeout
-                )
-
-                if r.status_code == 429:
-                    ra = r.headers.get("Retry-After")
-                    if ra:
-                        try:
-                            wait_s = max(wait_s, float(ra))
-                        except Exception:
-                            pass
-                    time.sleep(wait_s)
-                    wait_s = min(wait_s * 2, 20.0)
-                    continue
-
-                r.raise_for_status()
-                return r.json()
-
-            except Exception as e:
-                last_err = e
-                time.sleep(min(wait_s, 10.0))
-                wait_s = min(wait_s * 1.6, 15.0)
-
-    if last_err:
-        raise last_err
-    raise RuntimeError("Overpass request failed")
+                return cache.get_or_fetch(overpass_cache.cache_key(query), fetch)
+            except sqlite3.Error:
+                pass
+    return fetch()
 
 
-def fetch_trails_relations(
-    bbox: Tuple[float, float, float, float], max_relations: int = 50
-) -> List[Dict[str, Any]]:
+def clear_overpass_cache() -> None:
+    """디스크 캐시(쿼리 응답 + 코스 타일) 비우기 → 다음 조회는 서버에서 새로"""
+    try:
+        overpass_cache.default_cache().clear()
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def overpass_mirror_stats() -> Dict[str, Dict[str, Any]]:
+    return _overpass.mirror_stats()
+
+
+# 코스 조회 타일 그리드(도 단위). 요청 bbox를 타일에 맞춰 쪼개 겹치는 지역끼리 데이터 재사용
+TRAIL_TILE_DEG = 0.1
+
+
+def bbox_tiles(
+    bbox: Tuple[float, float, float, float], tile_deg: float = TRAIL_TILE_DEG
+) -> List[Tuple[int, int]]:
+    """bbox와 겹치는 타일 (ix, iy) 목록. ix: 위도 방향, iy: 경도 방향"""
     s, w, n, e = bbox
-    q = f"""
+    ix0, ix1 = math.floor(s / tile_deg), math.floor(n / tile_deg)
+    iy0, iy1 = math.floor(w / tile_deg), math.floor(e / tile_deg)
+    return [(ix, iy) for ix in range(ix0, ix1 + 1) for iy in range(iy0, iy1 + 1)]
+
+
+def tile_bbox(
+    tile: Tuple[int, int], tile_deg: float = TRAIL_TILE_DEG
+) -> Tuple[float, float, float, float]:
+    ix, iy = tile
+    return (
+        round(ix * tile_deg, 7),
+        round(iy * tile_deg, 7),
+        round((ix + 1) * tile_deg, 7),
+        round((iy + 1) * tile_deg, 7),
+    )
+
+
+def _element_bounds(el: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    b = el.get("bounds")
+    if b:
+        return (b["minlat"], b["minlon"], b["maxlat"], b["maxlon"])
+    lats: List[float] = []
+    lons: List[float] = []
+    for m in el.get("members") or []:
+        for p in m.get("geometry") or []:
+            if "lat" in p and "lon" in p:
+                lats.append(float(p["lat"]))
+                lons.append(float(p["lon"]))
+    if not lats:
+        return None
+    return (min(lats), min(lons), max(lats), max(lons))
+
+
+def _bbox_intersects(
+    a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]
+) -> bool:
+    return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
+
+
+def _trails_query(bbox: Tuple[float, float, float, float]) -> str:
+    s, w, n, e = bbox
+    return f"""
     [out:json][timeout:60];
     (
       relation["route"="hiking"]({s},{w},{n},{e});
       relation["route"="foot"]({s},{w},{n},{e});
     );
-    out body geom;
+    out meta geom;
     """
-    data = overpass_post(q, timeout=75)
-    elements = data.get("elements", [])
-    rels = [el for el in elements if el.get("type") == "relation"]
+
+
+def _tile_key(tile: Tuple[int, int], tile_deg: float) -> str:
+    # v3: 값은 relation id 목록(relation 본문은 _rel_key에 한 번만)
+    return overpass_cache.cache_key(f"trails-tile:v3:{tile_deg}:{tile[0]}:{tile[1]}")
+
+
+def _rel_key(rel_id: int) -> str:
+    return overpass_cache.cache_key(f"trails-rel:v1:{rel_id}")
+
+
+def fetch_trails_tiles(
+    tiles: List[Tuple[int, int]],
+    tile_deg: float = TRAIL_TILE_DEG,
+    use_cache: bool = True,
+) -> Dict[Tuple[int, int], List[Dict[str, Any]]]:
+    """
+    타일별 relation 목록.
+    - 캐시에 있는 타일은 재사용(타일 = relation id 목록, relation 본문은 id별로 한 번만 저장
+      → 여러 타일에 걸친 긴 코스도 한 벌)
+    - 없는 타일들은 그 타일들을 덮는 bbox 하나로 한 번만 요청한 뒤
+      relation bounds 기준으로 각 타일에 나눔
+    - 오래된(TTL 지난) 타일들도 같은 방식으로 덮는 요청 하나로 백그라운드 갱신
+    - use_cache=False: 캐시를 읽지 않고 전부 새로 받음(받은 결과는 캐시에 저장)
+    """
+    try:
+        cache: Optional[overpass_cache.OverpassCache] = overpass_cache.default_cache()
+    except Exception:
+        cache = None
+
+    tile_hits: Dict[str, Tuple[Any, float]] = {}
+    rel_hits: Dict[str, Tuple[Any, float]] = {}
+    if cache is not None and use_cache:
+        try:
+            tile_hits = cache.lookup_many([_tile_key(t, tile_deg) for t in tiles])
+            ids = {i for ids, _ in tile_hits.values() for i in ids}
+            rel_hits = cache.lookup_many([_rel_key(i) for i in ids])
+        except sqlite3.Error:
+            tile_hits, rel_hits = {}, {}
+
+    out: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    missing: List[Tuple[int, int]] = []
+    stale: Dict[str, Tuple[int, int]] = {}
+    for t in tiles:
+        key = _tile_key(t, tile_deg)
+        hit = tile_hits.get(key)
+        rels = None
+        if hit is not None:
+            found = [rel_hits.get(_rel_key(i)) for i in hit[0]]
+            if all(f is not None for f in found):
+                rels = [f[0] for f in found]
+        if rels is None:
+            missing.append(t)  # 타일이나 그 relation 중 하나라도 없으면 다시 받음
+            continue
+        out[t] = rels
+        if cache is not None and hit[1] > cache.ttl_s:
+            stale[key] = t
+
+    if missing:
+        out.update(_fetch_tiles(missing, tile_deg, cache))
+    if stale and cache is not None:
+        cache.refresh_in_background(
+            list(stale),
+            lambda keys: _fetch_tiles([stale[k] for k in keys], tile_deg, cache),
+        )
+    return out
+
+
+def _fetch_tiles(
+    tiles: List[Tuple[int, int]],
+    tile_deg: float,
+    cache: Optional[overpass_cache.OverpassCache],
+) -> Dict[Tuple[int, int], List[Dict[str, Any]]]:
+    """타일들을 덮는 bbox 하나로 요청 → 타일별로 나눠 (캐시가 있으면) 저장"""
+    boxes = [tile_bbox(t, tile_deg) for t in tiles]
+    cover = (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    )
+    rels = _fetch_relations(cover)
+    rel_bounds = [(r, _element_bounds(r)) for r in rels]
+
+    out: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    items: Dict[str, Any] = {}
+    for t, tb in zip(tiles, boxes):
+        in_tile = [r for r, rb in rel_bounds if rb and _bbox_intersects(rb, tb)]
+        out[t] = in_tile
+        items[_tile_key(t, tile_deg)] = [r["id"] for r in in_tile]
+        for r in in_tile:
+            items[_rel_key(r["id"])] = r
+    if cache is not None:
+        try:
+            cache.store_many(items)
+        except sqlite3.Error:
+            pass
+    return out
+
+
+def _fetch_relations(bbox: Tuple[float, float, float, float]) -> List[Dict[str, Any]]:
+    # 타일 단위로 따로 저장하므로 쿼리 단위 캐시는 건너뜀
+    data = overpass_post(_trails_query(bbox), timeout=75, use_cache=False)
+    return [el for el in data.get("elements", []) if el.get("type") == "relation"]
+
+
+def fetch_trails_relations(
+    bbox: Tuple[float, float, float, float],
+    max_relations: int = 50,
+    use_cache: bool = True,
+) -> List[Dict[str, Any]]:
+    tiles = bbox_tiles(bbox)
+    by_tile = fetch_trails_tiles(tiles, use_cache=use_cache)
+
+    # 타일 합치기: OSM id 기준 중복 제거 + 요청 bbox와 겹치는 것만
+    seen: set[int] = set()
+    rels: List[Dict[str, Any]] = []
+    for t in tiles:
+        for r in by_tile.get(t, []):
+            rid = r.get("id")
+            if rid in seen:
+                continue
+            seen.add(rid)
+            rb = _element_bounds(r)
+            if rb and _bbox_intersects(rb, bbox):
+                rels.append(r)
 
     rels_named = [r for r in rels if (r.get("tags") or {}).get("name")]
     rels = rels_named if rels_named else rels
@@ -159,46 +352,44 @@ def relation_to_course(rel: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
     sac = _safe_get(tags, "sac_scale", "")
 
-    latlon: List[Tuple[float, float]] = []
+    parts: List[np.ndarray] = []
     members = rel.get("members") or []
 
     for m in members:
         geom = m.get("geometry") or []
-        pts = [
-            (float(p["lat"]), float(p["lon"]))
-            for p in geom
-            if "lat" in p and "lon" in p
-        ]
+        pts = [(p["lat"], p["lon"]) for p in geom if "lat" in p and "lon" in p]
         if len(pts) >= 2:
-            if latlon:
-                # 이어붙일 때 너무 멀면 그냥 붙임
-                if haversine_m(latlon[-1][0], latlon[-1][1], pts[0][0], pts[0][1]) < 5:
-                    latlon.extend(pts[1:])
-                else:
-                    latlon.extend(pts)
-            else:
-                latlon.extend(pts)
-
-    if len(latlon) < 2:
+            parts.append(np.array(pts, dtype=np.float64))
+
+    # 끝점 그래프로 방향/순서를 맞춰 최소 개수의 연속 구간으로(relation 순서 무관)
+    segments = stitch.stitch_ways(parts)
+    if not segments:
         return None
+    coords = PackedLine.from_segments(segments)
 
-    dist_km = round(polyline_length_km(latlon), 2)
+    # 구간 사이 빈틈은 거리에 넣지 않음
+    dist_km = round(sum(geo.polyline_length_m(s) for s in segments) / 1000.0, 2)
     if dist_km < 1.0 or dist_km > 35.0:
         return None
 
     diff = difficulty_label(sac, dist_km)
-    start = latlon[0]
-    end = latlon[-1]
+    start = coords.first()
+    end = coords.last()
 
     score = round(math.log1p(len(members)) * 0.8 + math.log1p(dist_km) * 0.6, 3)
 
     return {
-        "course_id": f"{name} ({dist_km}km)",
+        "osm_id": rel.get("id"),
+        "osm_version": int(rel.get("version") or 0),
+        "course_id": f"r{rel.get('id')}",  # OSM relation id 기반(거리 반올림과 무관)
         "name": name,
+        "label": name,  # 화면 표시용(rank_courses가 같은 이름 구간을 구분)
         "distance_km": dist_km,
         "difficulty": diff,
         "score": score,
-        "coords": latlon,  # [(lat, lon), ...]
+        # 고정소수점 압축 좌표(구간 1개 = LineString, 여러 개 = MultiLineString)
+        "coords": coords,
+        **simplify_levels(segments),  # 지도용 단순화 단계
         "start_lat": start[0],
         "start_lon": start[1],
         "end_lat": end[0],
@@ -217,13 +408,99 @@ def build_courses(
         if c:
             courses.append(c)
 
-    courses.sort(key=lambda x: (x["score"], x["distance_km"]), reverse=True)
+    return rank_courses(courses)
+
+
+def split_course(course: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, PackedLine]]:
+    """코스 -> (요약 행: 좌표 대신 bbox, 좌표 묶음)"""
+    geometry = {k: course[k] for k in GEOMETRY_KEYS}
+    summary = {k: v for k, v in course.items() if k not in geometry}
+    s, w, n, e = course["coords"].bbox()
+    summary.update(min_lat=s, min_lon=w, max_lat=n, max_lon=e)
+    return summary, geometry
 
-    dedup: Dict[str, Dict[str, Any]] = {}
+
+def fetch_relations_by_id(osm_ids: List[int]) -> List[Dict[str, Any]]:
+    if not osm_ids:
+        return []
+    ids = ",".join(str(int(i)) for i in sorted(set(osm_ids)))
+    data = overpass_post(f"[out:json][timeout:60]; relation(id:{ids}); out meta geom;")
+    return [el for el in data.get("elements", []) if el.get("type") == "relation"]
+
+
+def simplify_levels(segments: List[Any]) -> Dict[str, PackedLine]:
+    """구간 배열 목록 → {"segments_coarse": PackedLine, "segments_fine": PackedLine}"""
+    return {
+        f"segments_{level}": PackedLine.from_segments(
+            [geo.simplify(seg, tol) for seg in segments]
+        )
+        for level, tol in SIMPLIFY_LEVELS.items()
+    }
+
+
+def course_key(course: Dict[str, Any]) -> str:
+    """캐시 키: relation id + 버전(OSM에서 고쳐지면 바뀜)"""
+    return f"{course['course_id']}@v{course.get('osm_version', 0)}"
+
+
+def _same_course(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """같은 이름의 두 relation이 사실상 같은 코스인지(방향만 반대인 경우 포함)"""
+    da, db = float(a["distance_km"]), float(b["distance_km"])
+    if abs(da - db) > DUP_DISTANCE_RATIO * max(da, db):
+        return False
+    s_a = (a["start_lat"], a["start_lon"])
+    e_a = (a["end_lat"], a["end_lon"])
+    s_b = (b["start_lat"], b["start_lon"])
+    e_b = (b["end_lat"], b["end_lon"])
+    for p, q in ((s_b, e_b), (e_b, s_b)):
+        if (
+            haversine_m(*s_a, *p) <= DUP_ENDPOINT_M
+            and haversine_m(*e_a, *q) <= DUP_ENDPOINT_M
+        ):
+            return True
+    return False
+
+
+def rank_courses(
+    courses: List[Dict[str, Any]], limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    점수·거리 내림차순, relation(course_id) 단위 중복 제거.
+    같은 이름끼리는
+    - 시작·끝점이 가깝고 길이가 거의 같으면 같은 코스 → 점수 높은 것만
+    - 아니면 같은 이름의 다른 구간(서울둘레길 구간 등) → 모두 남기고 label로 구분
+    """
+    courses = sorted(courses, key=lambda x: (x["score"], x["distance_km"]), reverse=True)
+
+    kept: List[Dict[str, Any]] = []
+    seen_ids: set[str] = set()
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
     for c in courses:
-        if c["name"] not in dedup:
-            dedup[c["name"]] = c
-    return list(dedup.values())
+        if c["course_id"] in seen_ids:
+            continue
+        same_name = by_name.setdefault(c["name"], [])
+        if any(_same_course(c, k) for k in same_name):
+            continue
+        seen_ids.add(c["course_id"])
+        same_name.append(c)
+        kept.append(c)
+        if limit is not None and len(kept) >= limit:
+            break
+
+    # 표시 이름: 같은 이름이 여럿이면 거리, 그래도 겹치면 relation id까지
+    out = []
+    for c in kept:
+        label = c["name"]
+        if len(by_name[c["name"]]) > 1:
+            label = f"{c['name']} ({c['distance_km']}km)"
+        out.append({**c, "label": label})
+    counts: Dict[str, int] = {}
+    for c in out:
+        counts[c["label"]] = counts.get(c["label"], 0) + 1
+    for c in out:
+        if counts[c["label"]] > 1:
+            c["label"] = f"{c['label']} #{c['osm_id']}"
+    return out
 
 
 def overpass_places_query(lat: float, lon: float, radius_m: int) -> str:
@@ -239,7 +516,10 @@ def overpass_places_query(lat: float, lon: float, radius_m: int) -> str:
 
 
 def extract_place(
-    el: Dict[str, Any], origin_lat: float, origin_lon: float
+    el: Dict[str, Any],
+    origin_lat: float,
+    origin_lon: float,
+    distance_m: Optional[float] = None,
 ) -> Optional[Dict[str, Any]]:
     if el.get("type") != "node":
         return None
@@ -255,7 +535,9 @@ def extract_place(
 
     amenity = tags.get("amenity", "")
     category = "coffee" if amenity == "cafe" else "beer"
-    dist = int(haversine_m(origin_lat, origin_lon, float(lat), float(lon)))
+    if distance_m is None:
+        distance_m = haversine_m(origin_lat, origin_lon, float(lat), float(lon))
+    dist = int(distance_m)
 
     quality = 0
     if tags.get("opening_hours"):
@@ -278,12 +560,34 @@ def extract_place(
     }
 
 
-def places_near(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
-    q = overpass_places_query(lat, lon, radius_m)
-    data = overpass_post(q, timeout=60)
-    elements = data.get("elements", [])
+def overpass_places_area_query(bbox: Tuple[float, float, float, float]) -> str:
+    """bbox 안 전체 카페/바/펍(POI 색인 빌드용)"""
+    s, w, n, e = bbox
+    amenity = "|".join(PLACE_AMENITIES)
+    return f"""
+    [out:json][timeout:180];
+    node[amenity~"^({amenity})$"]({s},{w},{n},{e});
+    out body;
+    """
+
 
-    places = [p for p in (extract_place(el, lat, lon) for el in elements) if p]
+def overpass_places_batch_query(centers: Sequence[Tuple[float, float, int]]) -> str:
+    """(lat, lon, 반경 m) 여러 개를 around 합집합 한 번으로"""
+    amenity = "|".join(PLACE_AMENITIES)
+    around = "\n".join(
+        f'      node(around:{int(r)},{lat:.6f},{lon:.6f})[amenity~"^({amenity})$"];'
+        for lat, lon, r in centers
+    )
+    return f"""
+    [out:json][timeout:90];
+    (
+{around}
+    );
+    out body;
+    """
+
+
+def _rank_places(places: List[Dict[str, Any]], radius_m: int) -> List[Dict[str, Any]]:
     for p in places:
         dist_score = 1 - (p["distance_m"] / max(1, radius_m))
         p["combined_score"] = round(
@@ -294,6 +598,72 @@ def places_near(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
     return places
 
 
+def places_near(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
+    q = overpass_places_query(lat, lon, radius_m)
+    data = overpass_post(q, timeout=60)
+    elements = data.get("elements", [])
+
+    # 거리는 한 번에 계산(좌표 없는 요소는 nan → extract_place에서 걸러짐)
+    pts = [
+        (el["lat"], el["lon"])
+        if el.get("lat") is not None and el.get("lon") is not None
+        else (np.nan, np.nan)
+        for el in elements
+    ]
+    dists = geo.distances_from(lat, lon, pts).tolist()
+    places = [
+        p
+        for p in (extract_place(el, lat, lon, d) for el, d in zip(elements, dists))
+        if p
+    ]
+    return _rank_places(places, radius_m)
+
+
+def places_near_many(
+    centers: Sequence[Tuple[float, float, int]],
+) -> List[List[Dict[str, Any]]]:
+    """
+    여러 지점(lat, lon, 반경 m)의 주변 장소를 Overpass 요청 한 번으로.
+    결과 노드를 격자 색인(spatial_index.PointIndex)에 넣고 지점별 반경 질의로 나눔.
+    반환: centers 순서대로 places_near와 같은 형식의 목록
+    """
+    if not centers:
+        return []
+    data = overpass_post(overpass_places_batch_query(centers), timeout=90)
+
+    # 반경이 겹치는 지점 사이의 같은 노드는 한 번만
+    nodes: Dict[Any, Dict[str, Any]] = {}
+    for el in data.get("elements", []):
+        if el.get("lat") is not None and el.get("lon") is not None:
+            nodes.setdefault((el.get("type"), el.get("id")), el)
+    elements = list(nodes.values())
+    index = spatial_index.PointIndex([(el["lat"], el["lon"]) for el in elements])
+
+    return [
+        places_from_index(elements, index, lat, lon, radius_m)
+        for lat, lon, radius_m in centers
+    ]
+
+
+def places_from_index(
+    elements: List[Dict[str, Any]],
+    index: spatial_index.PointIndex,
+    lat: float,
+    lon: float,
+    radius_m: int,
+) -> List[Dict[str, Any]]:
+    """색인된 노드(elements[i] ↔ index 번호 i) 중 반경 안 장소. places_near와 같은 형식"""
+    places = [
+        p
+        for p in (
+            extract_place(elements[i], lat, lon, d)
+            for d, i in index.within(lat, lon, radius_m)
+        )
+        if p
+    ]
+    return _rank_places(places, radius_m)
+
+
 # ===== ORS 고도 프로파일 =====
 
 
@@ -310,8 +680,31 @@ def _sample_latlon(
     return sampled
 
 
+def _sample_segments(
+    segments: List[np.ndarray], max_points: int
+) -> Tuple[List[Tuple[float, float]], List[int]]:
+    """
+    구간별로 같은 간격으로 솎아 이은 [(lat, lon), ...]와
+    새 구간이 시작하는 점 번호 목록(0 제외). 구간 시작/끝점은 항상 유지
+    """
+    total = sum(len(seg) for seg in segments)
+    step = max(1, math.ceil(total / max(1, max_points - len(segments))))
+    line: List[Tuple[float, float]] = []
+    starts: List[int] = []
+    for seg in segments:
+        if not len(seg):
+            continue
+        pts = seg[::step]
+        if len(seg) > 1 and (len(seg) - 1) % step:
+            pts = np.concatenate([pts, seg[-1:]])
+        if line:
+            starts.append(len(line))
+        line.extend(zip(pts[:, 0].tolist(), pts[:, 1].tolist()))
+    return line, starts
+
+
 def ors_elevation_line(
-    latlon: List[Tuple[float, float]],
+    latlon: Union[PackedLine, List[Tuple[float, float]]],
     api_key: str,
     dataset: str = "srtm",
 ) -> List[Tuple[float, float, float]]:
@@ -322,6 +715,8 @@ def ors_elevation_line(
     if not api_key:
         raise ValueError("ORS_API_KEY is empty")
 
+    if isinstance(latlon, PackedLine):
+        latlon = latlon.latlon()
     latlon = _sample_latlon(latlon, max_points=min(ORS_MAX_VERTICES - 50, 1800))
     coords_lonlat = [[float(lon), float(lat)] for (lat, lon) in latlon]
 
@@ -333,7 +728,9 @@ def ors_elevation_line(
     }
     headers = {"Authorization": api_key, "Content-Type": "application/json", **UA}
 
-    r = requests.post(ORS_ELEVATION_LINE_URL, json=payload, headers=headers, timeout=60)
+    r = http_client.post(
+        ORS_ELEVATION_LINE_URL, json=payload, headers=headers, timeout=60
+    )
     r.raise_for_status()
     data = r.json()
 
@@ -349,20 +746,25 @@ def ors_elevation_line(
 
 
 def elevation_profile(
-    latlon: List[Tuple[float, float]], api_key: str
+    latlon: Union[PackedLine, List[Tuple[float, float]]], api_key: str
 ) -> List[Dict[str, float]]:
-    coords3d = ors_elevation_line(latlon, api_key=api_key)
+    # 끊긴 코스(여러 구간)는 이어서 한 번에 요청하되, 구간 사이 직선 이동은 누적 거리에서 뺌
+    if isinstance(latlon, PackedLine):
+        segments = latlon.segment_arrays()
+    else:
+        segments = [geo.as_array(latlon)]
+    line, starts = _sample_segments(segments, max_points=min(ORS_MAX_VERTICES - 50, 1800))
+    coords3d = ors_elevation_line(line, api_key=api_key)
     if len(coords3d) < 2:
         return []
 
-    prof: List[Dict[str, float]] = []
-    dist_km = 0.0
-    prof.append({"dist_km": 0.0, "elev_m": float(coords3d[0][2])})
-
-    for i in range(1, len(coords3d)):
-        prev = coords3d[i - 1]
-        cur = coords3d[i]
-        dist_km += haversine_m(prev[0], prev[1], cur[0], cur[1]) / 1000.0
-        prof.append({"dist_km": round(dist_km, 4), "elev_m": float(cur[2])})
-
-    return prof
+    # ORS는 보낸 점마다 고도를 붙여 같은 순서로 돌려줌 → 좌표 비교 없이 점 번호로
+    # 새 구간 시작점 i로 들어오는 이동(steps[i - 1])을 0으로
+    steps = geo.segment_lengths_m([c[:2] for c in coords3d])
+    if starts and len(coords3d) == len(line):
+        steps[np.asarray(starts) - 1] = 0.0
+    cum_km = (np.concatenate([[0.0], np.cumsum(steps)]) / 1000.0).tolist()
+    return [
+        {"dist_km": round(d, 4), "elev_m": float(c[2])}
+        for d, c in zip(cum_km, coords3d)
+    ]
@@ -0,0 +1,244 @@
+# overpass_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import overpass_client
+
+# 여러 Streamlit 워커/재시작 간에 공유되는 Overpass 응답 디스크 캐시
+# - 키: 정규화된 쿼리 텍스트의 sha256
+# - 값: zlib 압축 JSON
+# - TTL 경과 후 stale 구간 동안은 오래된 값을 돌려주고 백그라운드에서 갱신
+# - 전체 크기가 max_bytes를 넘으면 최근 사용이 오래된 항목부터 삭제(LRU)
+# - remark 오류(시간 초과/메모리 부족) 응답은 저장하지 않음(이미 있으면 없는 것으로 취급)
+
+CACHE_PATH = os.getenv(
+    "OVERPASS_CACHE_PATH", os.path.join(".cache", "overpass_cache.sqlite3")
+)
+CACHE_TTL_S = float(os.getenv("OVERPASS_CACHE_TTL_S", str(60 * 60 * 24)))
+CACHE_STALE_S = float(os.getenv("OVERPASS_CACHE_STALE_S", str(60 * 60 * 24 * 7)))
+CACHE_MAX_BYTES = int(os.getenv("OVERPASS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+_SQL_CHUNK = 500  # IN (...) 한 번에 넣는 키 수(SQLite 변수 개수 제한 아래)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    # 들여쓰기/줄바꿈만 다른 동일 쿼리를 같은 키로
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def cache_key(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+class OverpassCache:
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttl_s: float = CACHE_TTL_S,
+        stale_s: float = CACHE_STALE_S,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite 커넥션은 스레드별로
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], float]:
+        """(값, 나이[s]) 반환. 없거나 stale 구간도 지났으면 (None, inf)"""
+        hit = self.lookup_many([key]).get(key)
+        return hit if hit is not None else (None, float("inf"))
+
+    def lookup_many(self, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """키 여러 개를 한 번에: {키: (값, 나이[s])}. 없거나 쓸 수 없는 키는 빠짐"""
+        conn = self._conn()
+        rows = []
+        keys = list(dict.fromkeys(keys))
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i : i + _SQL_CHUNK]
+            rows += conn.execute(
+                "SELECT key, created_at, body FROM responses"
+                f" WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+
+        now = time.time()
+        out: Dict[str, Tuple[Any, float]] = {}
+        drop = []
+        for key, created_at, body in rows:
+            age = now - created_at
+            value = None
+            if age <= self.ttl_s + self.stale_s:
+                try:
+                    value = json.loads(zlib.decompress(body).decode("utf-8"))
+                except Exception:
+                    value = None
+            if value is None or overpass_client.remark_error(value):
+                drop.append((key,))
+                continue
+            out[key] = (value, age)
+
+        if drop:
+            conn.executemany("DELETE FROM responses WHERE key = ?", drop)
+        if out:
+            conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(now, k) for k in out],
+            )
+        if drop or out:
+            conn.commit()
+        return out
+
+    def store(self, key: str, value: Any) -> None:
+        self.store_many({key: value})
+
+    def store_many(self, items: Dict[str, Any]) -> None:
+        """한 트랜잭션으로 저장(remark 오류 값은 건너뜀)"""
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            if overpass_client.remark_error(value):
+                continue
+            body = zlib.compress(
+                json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                6,
+            )
+            rows.append((key, now, now, len(body), body))
+        if not rows:
+            return
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO responses (key, created_at, accessed_at, size, body) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        drop = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            drop.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", drop)
+        conn.commit()
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        - fresh: 캐시 값
+        - stale: 캐시 값 반환 + 백그라운드 갱신(stale-while-revalidate)
+        - miss: fetch() 후 저장(저장 실패는 무시하고 값은 그대로 반환)
+        remark 오류 응답은 저장/반환하지 않고 OverpassRemarkError
+        """
+        value, age = self.lookup(key)
+        if value is not None:
+            if age > self.ttl_s:
+                self.revalidate(key, fetch)
+            return value
+
+        value = fetch()
+        remark = overpass_client.remark_error(value)
+        if remark:
+            raise overpass_client.OverpassRemarkError("cache fetch", remark)
+        try:
+            self.store(key, value)
+        except sqlite3.Error:
+            pass
+        return value
+
+    def revalidate(self, key: str, fetch: Callable[[], Any]) -> None:
+        """백그라운드에서 fetch() 결과로 갱신(키당 동시에 하나만)"""
+        self.refresh_in_background([key], lambda keys: self.store(key, fetch()))
+
+    def refresh_in_background(
+        self, keys: List[str], job: Callable[[List[str]], None]
+    ) -> None:
+        """
+        job(맡은 키 목록)을 백그라운드 스레드 하나로 실행.
+        이미 다른 갱신이 맡은 키는 빼고 넘김(남는 키가 없으면 실행 안 함)
+        """
+        with self._lock:
+            claimed = [k for k in dict.fromkeys(keys) if k not in self._refreshing]
+            if not claimed:
+                return
+            self._refreshing.update(claimed)
+
+        def run() -> None:
+            try:
+                job(claimed)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(claimed)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        n, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {"entries": int(n), "bytes": int(size)}
+
+
+_default: Optional[OverpassCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> OverpassCache:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = OverpassCache()
+        return _default
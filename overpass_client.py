@@ -0,0 +1,314 @@
+# overpass_client.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import http_client
+from ratelimit import CircuitBreaker, TokenBucket, parse_retry_after
+
+# Overpass 미러 hedged 요청
+# - 가장 빠른(건강한) 미러에 먼저 요청
+# - hedge 지연 안에 응답이 없으면 다음 미러에 백업 요청
+# - 먼저 도착한 정상 응답을 쓰고 나머지는 취소(다운로드 중단)
+#   (remark 오류가 담긴 200 응답은 정상으로 보지 않음, 429 외 4xx는 재시도 없이 바로 실패)
+# - 미러별 지연/오류율 EWMA로 다음 호출의 우선순위 결정
+# - 미러별 토큰 버킷(프로세스 전역, Retry-After 반영) + 서킷 브레이커
+
+EWMA_ALPHA = 0.3
+DEFAULT_LATENCY_S = 1.5  # 아직 측정 안 된 미러의 가정 지연(→ hedge 지연은 HEDGE_MIN_DELAY_S)
+HEDGE_MIN_DELAY_S = 3.0
+HEDGE_MAX_DELAY_S = 15.0
+ERROR_PENALTY = 4.0
+CHUNK_BYTES = 64 * 1024
+
+MIRROR_RATE_PER_S = 0.5  # 미러당 평균 요청 속도(모든 세션 합산)
+MIRROR_BURST = 2
+RATE_WAIT_MAX_S = 30.0
+BACKOFF_429_S = 10.0  # Retry-After가 없을 때
+BACKOFF_ERROR_S = 2.0
+BREAKER_FAILURES = 3
+BREAKER_RESET_S = 60.0
+
+
+class OverpassCancelled(Exception):
+    pass
+
+
+class OverpassUnavailable(Exception):
+    """서킷이 열렸거나 토큰을 기다리다 포기한 미러"""
+
+
+class OverpassHTTPError(Exception):
+    def __init__(self, url: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"Overpass {status} from {url}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+class OverpassQueryError(OverpassHTTPError):
+    """429 외 4xx: 쿼리 자체의 문제 → 다른 미러/라운드로 재시도하지 않고 미러 탓으로 세지 않음"""
+
+
+class OverpassRemarkError(Exception):
+    """200 응답이지만 remark에 런타임 오류(시간 초과/메모리 부족) → elements가 비었거나 일부뿐"""
+
+    def __init__(self, url: str, remark: str):
+        super().__init__(f"Overpass remark from {url}: {remark}")
+        self.url = url
+        self.remark = remark
+
+
+def remark_error(data: Any) -> Optional[str]:
+    """Overpass 응답의 remark(런타임 오류 보고). 정상 응답이면 None"""
+    if not isinstance(data, dict):
+        return None
+    remark = data.get("remark")
+    return str(remark) if remark else None
+
+
+class MirrorStats:
+    def __init__(self) -> None:
+        self.latency_s: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+
+    def record(self, ok: bool, latency_s: Optional[float] = None) -> None:
+        self.requests += 1
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if latency_s is not None:
+            if self.latency_s is None:
+                self.latency_s = latency_s
+            else:
+                self.latency_s += EWMA_ALPHA * (latency_s - self.latency_s)
+
+    def record_floor(self, latency_s: float) -> None:
+        """
+        hedge 경쟁에서 진 요청: 최소 latency_s는 걸렸다는 하한 표본.
+        지금 추정보다 느릴 때만 반영(오류율/요청 수는 그대로)
+        """
+        if self.latency_s is None:
+            self.latency_s = latency_s
+        elif latency_s > self.latency_s:
+            self.latency_s += EWMA_ALPHA * (latency_s - self.latency_s)
+
+    def expected_latency(self) -> float:
+        return self.latency_s if self.latency_s is not None else DEFAULT_LATENCY_S
+
+    def score(self) -> float:
+        # 낮을수록 좋음
+        return self.expected_latency() * (1.0 + ERROR_PENALTY * self.error_rate)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "latency_s": None if self.latency_s is None else round(self.latency_s, 3),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+        }
+
+
+class OverpassClient:
+    def __init__(
+        self,
+        urls: List[str],
+        headers: Optional[Dict[str, str]] = None,
+        max_workers: int = 8,
+    ) -> None:
+        self.urls = list(urls)
+        self.headers = dict(headers or {})
+        self.stats = {u: MirrorStats() for u in self.urls}
+        self.buckets = {u: TokenBucket(MIRROR_RATE_PER_S, MIRROR_BURST) for u in self.urls}
+        self.breakers = {
+            u: CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_S) for u in self.urls
+        }
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="overpass"
+        )
+
+    def ranked(self) -> List[str]:
+        """서킷이 닫힌 미러를 (토큰 대기 + 예상 지연) 순으로. 동점이면 설정 순서"""
+        urls = [u for u in self.urls if self.breakers[u].available()]
+        waits = {u: self.buckets[u].wait_time() for u in urls}
+        with self._lock:
+            return sorted(urls, key=lambda u: waits[u] + self.stats[u].score())
+
+    def hedge_delay(self, url: str) -> float:
+        with self._lock:
+            expected = self.stats[url].expected_latency()
+        return min(HEDGE_MAX_DELAY_S, max(HEDGE_MIN_DELAY_S, expected * 1.5))
+
+    def _record(self, url: str, ok: bool, latency_s: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats[url].record(ok, latency_s)
+
+    def _attempt(
+        self, url: str, query: str, timeout: int, cancel: threading.Event
+    ) -> Dict[str, Any]:
+        if cancel.is_set():
+            raise OverpassCancelled(url)
+
+        breaker = self.breakers[url]
+        bucket = self.buckets[url]
+        if not breaker.allow():
+            raise OverpassUnavailable(f"circuit open: {url}")
+        if not bucket.acquire(timeout=RATE_WAIT_MAX_S, cancel=cancel):
+            breaker.release()
+            if cancel.is_set():
+                raise OverpassCancelled(url)
+            raise OverpassUnavailable(f"rate limited: {url}")
+
+        try:
+            return self._request(url, query, timeout, cancel)
+        except (OverpassCancelled, OverpassQueryError):
+            breaker.release()
+            raise
+        except OverpassHTTPError as e:
+            breaker.record_failure()
+            if e.status == 429:
+                bucket.penalize(e.retry_after if e.retry_after is not None else BACKOFF_429_S)
+            else:
+                bucket.penalize(BACKOFF_ERROR_S)
+            raise
+        except Exception:
+            breaker.record_failure()
+            bucket.penalize(BACKOFF_ERROR_S)
+            raise
+
+    def _request(
+        self, url: str, query: str, timeout: int, cancel: threading.Event
+    ) -> Dict[str, Any]:
+        t0 = time.monotonic()
+        try:
+            r = http_client.post(
+                url,
+                data=query.encode("utf-8"),
+                headers=self.headers,
+                timeout=timeout,
+                stream=True,
+            )
+        except Exception:
+            self._record(url, ok=False)
+            raise
+
+        with r:
+            if r.status_code == 429 or r.status_code >= 500:
+                self._record(url, ok=False)
+                raise OverpassHTTPError(
+                    url, r.status_code, parse_retry_after(r.headers.get("Retry-After"))
+                )
+            if 400 <= r.status_code < 500:
+                # 쿼리 문제이지 미러 장애가 아님(통계/서킷에 반영하지 않음)
+                raise OverpassQueryError(url, r.status_code)
+            try:
+                r.raise_for_status()
+                # 다른 미러가 이기면 본문 다운로드를 중단
+                buf = bytearray()
+                for chunk in r.iter_content(CHUNK_BYTES):
+                    if cancel.is_set():
+                        raise OverpassCancelled(url)
+                    buf.extend(chunk)
+                data = json.loads(bytes(buf).decode("utf-8"))
+            except OverpassCancelled:
+                raise
+            except Exception:
+                self._record(url, ok=False)
+                raise
+
+        # 200이어도 remark(시간 초과/메모리 부족)면 elements가 불완전 → 실패로 보고 다음 미러
+        remark = remark_error(data)
+        if remark:
+            self._record(url, ok=False)
+            raise OverpassRemarkError(url, remark)
+
+        self._record(url, ok=True, latency_s=time.monotonic() - t0)
+        self.breakers[url].record_success()
+        return data
+
+    def post(
+        self, query: str, timeout: int = 60, max_retries: int = 3, hedge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        hedge=True: 지연 임계값이 지나면 다음 미러로 백업 요청
+        hedge=False: 실패했을 때만 다음 미러로(순차 로테이션)
+        한 라운드에서 모든 미러가 실패하면 최대 max_retries 라운드까지 반복.
+        백오프는 미러별 토큰 버킷 대기로 처리(실패/429 시 penalize)
+        """
+        last_err: Exception | None = None
+
+        for _ in range(max(1, max_retries)):
+            order = self.ranked()
+            if not order:
+                # 모든 미러 서킷 open: 가장 먼저 풀리는 미러를 기다림
+                wait_s = min(b.retry_in() for b in self.breakers.values())
+                if wait_s > RATE_WAIT_MAX_S:
+                    break
+                time.sleep(max(0.0, wait_s))
+                continue
+            cancel = threading.Event()
+            pending: Dict[Future, str] = {}
+            launched: Dict[Future, float] = {}
+            next_idx = 0
+
+            def launch() -> None:
+                nonlocal next_idx
+                url = order[next_idx]
+                next_idx += 1
+                f = self._pool.submit(self._attempt, url, query, timeout, cancel)
+                pending[f] = url
+                launched[f] = time.monotonic()
+
+            launch()
+            try:
+                while pending:
+                    can_hedge = hedge and next_idx < len(order)
+                    delay = self.hedge_delay(order[next_idx - 1]) if can_hedge else None
+                    done, _ = wait(list(pending), timeout=delay, return_when=FIRST_COMPLETED)
+
+                    if not done:
+                        launch()  # 백업 요청
+                        continue
+
+                    for f in done:
+                        pending.pop(f)
+                        try:
+                            data = f.result()
+                        except OverpassCancelled:
+                            pass
+                        except OverpassQueryError:
+                            raise  # 어느 미러에서도 같은 결과
+                        except Exception as e:
+                            last_err = e
+                        else:
+                            # 진 미러들은 취소돼 측정값이 없으므로 "여기까지 걸림" 하한을 기록
+                            # → 느린 미러가 계속 1순위로 남아 매번 hedge 지연을 기다리지 않도록
+                            now = time.monotonic()
+                            with self._lock:
+                                for lf, lurl in pending.items():
+                                    self.stats[lurl].record_floor(now - launched[lf])
+                            return data
+
+                    if not pending and next_idx < len(order):
+                        launch()
+            finally:
+                cancel.set()
+                for f in pending:
+                    f.cancel()
+
+        if last_err:
+            raise last_err
+        raise OverpassUnavailable("all Overpass mirrors are unavailable")
+
+    def mirror_stats(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for u in self.urls:
+            with self._lock:
+                snap = self.stats[u].snapshot()
+            snap["circuit"] = self.breakers[u].state
+            snap["token_wait_s"] = round(self.buckets[u].wait_time(), 3)
+            out[u] = snap
+        return out
@@ -0,0 +1,105 @@
+# packed_line.py
+from __future__ import annotations
+
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+# 코스 좌표의 압축 표현
+# - (lat, lon)을 1e-7도 고정소수점 int32로 저장(약 1cm 정밀도) → 점당 8바이트
+#   (파이썬 (float, float) 튜플 리스트는 점당 100바이트 이상)
+# - 여러 구간(MultiLineString)은 구간별 점 개수로 나눔
+# - 값은 bytes 두 개뿐이라 pickle/해시(st.cache_data)가 빠르고 작음
+# - 디코딩은 필요할 때만: fixed()는 복사 없는 int32 뷰, array()는 float64 (N, 2)
+
+SCALE = 10_000_000
+
+
+class PackedLine:
+    __slots__ = ("data", "sizes")
+
+    def __init__(self, data: bytes, sizes: bytes) -> None:
+        self.data = data  # int32 [lat, lon, lat, lon, ...] (little-endian)
+        self.sizes = sizes  # uint32 구간별 점 개수 (little-endian)
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[Any]) -> "PackedLine":
+        """구간 목록([(lat, lon), ...] 또는 (N, 2) 배열들)"""
+        arrs = [np.asarray(s, dtype=np.float64).reshape(-1, 2) for s in segments]
+        arrs = [a for a in arrs if len(a)]
+        if not arrs:
+            return cls(b"", b"")
+        fixed = np.rint(np.concatenate(arrs) * SCALE).astype("<i4")
+        return cls(fixed.tobytes(), np.asarray([len(a) for a in arrs], dtype="<u4").tobytes())
+
+    @classmethod
+    def from_latlon(cls, latlon: Sequence[Any]) -> "PackedLine":
+        return cls.from_segments([latlon])
+
+    def __len__(self) -> int:
+        return len(self.data) // 8
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedLine):
+            return NotImplemented
+        return self.data == other.data and self.sizes == other.sizes
+
+    def __hash__(self) -> int:
+        return hash((self.data, self.sizes))
+
+    def __getstate__(self) -> Tuple[bytes, bytes]:
+        return self.data, self.sizes
+
+    def __setstate__(self, state: Tuple[bytes, bytes]) -> None:
+        self.data, self.sizes = state
+
+    def __repr__(self) -> str:
+        return f"PackedLine(points={len(self)}, segments={len(self.segment_sizes())})"
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + len(self.sizes)
+
+    def segment_sizes(self) -> List[int]:
+        return np.frombuffer(self.sizes, dtype="<u4").tolist()
+
+    def fixed(self) -> np.ndarray:
+        """(N, 2) int32, 복사 없음(읽기 전용)"""
+        return np.frombuffer(self.data, dtype="<i4").reshape(-1, 2)
+
+    def array(self) -> np.ndarray:
+        """(N, 2) float64 [lat, lon]"""
+        return self.fixed() / SCALE
+
+    def segment_arrays(self) -> List[np.ndarray]:
+        arr = self.array()
+        out = []
+        i = 0
+        for n in self.segment_sizes():
+            out.append(arr[i : i + n])
+            i += n
+        return out
+
+    def latlon(self) -> List[Tuple[float, float]]:
+        """모든 구간을 이은 [(lat, lon), ...]"""
+        arr = self.array()
+        return list(zip(arr[:, 0].tolist(), arr[:, 1].tolist()))
+
+    def segments(self) -> List[List[List[float]]]:
+        """folium.PolyLine용 [[[lat, lon], ...], ...]"""
+        return [s.tolist() for s in self.segment_arrays()]
+
+    def first(self) -> Tuple[float, float]:
+        lat, lon = self.fixed()[0].tolist()
+        return lat / SCALE, lon / SCALE
+
+    def last(self) -> Tuple[float, float]:
+        lat, lon = self.fixed()[-1].tolist()
+        return lat / SCALE, lon / SCALE
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """(south, west, north, east)"""
+        f = self.fixed()
+        lo = f.min(axis=0) / SCALE
+        hi = f.max(axis=0) / SCALE
+        return float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])
@@ -0,0 +1,255 @@
+# poi_index.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import osm_backend as ob
+import spatial_index
+
+# 서울 카페/바/펍 로컬 색인(도시 전체 Overpass 추출 한 번 → 로컬 SQLite → 메모리 격자)
+# - 빌드: SEOUL_BBOX 전체 amenity=cafe|bar|pub 노드를 한 번에 받아 저장
+# - 조회: 파일을 한 번 읽어 spatial_index.PointIndex로 색인 → 지점/반경이 바뀌어도 요청 없이 수 ms
+# - 결과는 osm_backend.places_near와 같은 형식·점수(extract_place + _rank_places)
+# - 색인이 지점을 덮지 못하면(없음/버전 불일치/범위 밖) Overpass로 대체
+#
+#   python poi_index.py            # cron 등으로 주기 실행
+#   python poi_index.py --info
+
+POI_PATH = os.getenv("POI_INDEX_PATH", os.path.join(".cache", "poi_index.sqlite3"))
+# 카페/바는 천천히 바뀜 → 코스 카탈로그보다 자주, 하루 단위로 갱신
+POI_MAX_AGE_S = float(os.getenv("POI_INDEX_MAX_AGE_S", str(60 * 60 * 24)))
+# 스키마가 바뀌면 올림 → 이전 파일은 없는 것으로 취급
+POI_VERSION = 1
+# 코스 카탈로그보다 사방 2km 넓게(종료점 + 최대 반경 2km가 들어감). 경도 폭은 cos(위도) 반영
+SEOUL_BBOX = spatial_index.radius_bbox(37.5665, 126.9780, 26_000.0)
+
+# extract_place가 쓰는 태그만 저장
+POI_TAGS = (
+    "name", "amenity", "opening_hours", "website", "contact:website", "addr:street", "addr:full",
+)
+
+_SCHEMA = """
+CREATE TABLE pois (
+    osm_id INTEGER PRIMARY KEY,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_refresh_lock = threading.Lock()
+_refreshing = False
+
+_load_lock = threading.Lock()
+_loaded: Dict[str, Tuple[float, "PoiIndex"]] = {}  # path -> (built_at, 색인)
+# path -> (파일 stamp, index_info 결과). 파일은 os.replace로만 바뀌므로 stamp가 같으면 그대로
+_info: Dict[str, Tuple[Tuple[int, int, int], Optional[Dict[str, Any]]]] = {}
+
+
+class PoiIndex:
+    def __init__(self, elements: List[Dict[str, Any]]) -> None:
+        self.elements = elements
+        self._index = spatial_index.PointIndex([(el["lat"], el["lon"]) for el in elements])
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def places_near(self, lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
+        return ob.places_from_index(self.elements, self._index, lat, lon, radius_m)
+
+
+def build_index(
+    path: str = POI_PATH,
+    bbox: Tuple[float, float, float, float] = SEOUL_BBOX,
+) -> int:
+    """bbox 안 카페/바/펍을 저장. 저장한 장소 수"""
+    # 디스크 캐시를 거치지 않음(갱신이 목적)
+    data = ob.overpass_post(ob.overpass_places_area_query(bbox), timeout=240, use_cache=False)
+    rows = []
+    for el in data.get("elements", []):
+        tags = el.get("tags") or {}
+        if el.get("type") != "node" or not tags.get("name"):
+            continue
+        if el.get("lat") is None or el.get("lon") is None:
+            continue
+        keep = {k: tags[k] for k in POI_TAGS if k in tags}
+        rows.append(
+            (int(el["id"]), float(el["lat"]), float(el["lon"]), json.dumps(keep, ensure_ascii=False))
+        )
+
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT OR REPLACE INTO pois VALUES (?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", str(POI_VERSION)),
+                ("built_at", str(time.time())),
+                ("bbox", ",".join(str(v) for v in bbox)),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def _connect(path: str) -> Optional[sqlite3.Connection]:
+    if not os.path.exists(path):
+        return None
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def index_info(path: str = POI_PATH) -> Optional[Dict[str, Any]]:
+    """built_at/bbox/places. 색인이 없으면 None(파일이 바뀌지 않았으면 DB를 열지 않음)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _info.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    info = _read_info(path)
+    _info[path] = (stamp, info)
+    return info
+
+
+def _read_info(path: str) -> Optional[Dict[str, Any]]:
+    conn = _connect(path)
+    if conn is None:
+        return None
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        (n,) = conn.execute("SELECT COUNT(*) FROM pois").fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    if meta.get("version") != str(POI_VERSION):
+        return None
+    return {
+        "built_at": float(meta.get("built_at", 0)),
+        "bbox": tuple(float(v) for v in meta.get("bbox", "0,0,0,0").split(",")),
+        "places": n,
+    }
+
+
+def covers(
+    centers: Sequence[Tuple[float, float, int]],
+    path: str = POI_PATH,
+    max_age_s: Optional[float] = None,
+) -> bool:
+    """모든 (lat, lon, 반경 m) 원이 색인 범위 안이고 (max_age_s가 있으면) 충분히 최근인지"""
+    info = index_info(path)
+    if not info:
+        return False
+    s, w, n, e = info["bbox"]
+    for lat, lon, radius_m in centers:
+        bs, bw, bn, be = spatial_index.radius_bbox(lat, lon, radius_m)
+        if not (s <= bs and w <= bw and bn <= n and be <= e):
+            return False
+    return max_age_s is None or time.time() - info["built_at"] <= max_age_s
+
+
+def load_index(path: str = POI_PATH) -> Optional[PoiIndex]:
+    """메모리 색인(파일이 다시 빌드되면 새로 읽음). 없으면 None"""
+    info = index_info(path)
+    if info is None:
+        return None
+    with _load_lock:
+        hit = _loaded.get(path)
+        if hit and hit[0] == info["built_at"]:
+            return hit[1]
+        conn = _connect(path)
+        if conn is None:
+            return None
+        try:
+            elements = [
+                {"type": "node", "id": osm_id, "lat": lat, "lon": lon, "tags": json.loads(tags)}
+                for osm_id, lat, lon, tags in conn.execute("SELECT osm_id, lat, lon, tags FROM pois")
+            ]
+        finally:
+            conn.close()
+        index = PoiIndex(elements)
+        _loaded[path] = (info["built_at"], index)
+        return index
+
+
+def places_near_many(
+    centers: Sequence[Tuple[float, float, int]], path: str = POI_PATH
+) -> List[List[Dict[str, Any]]]:
+    """로컬 색인이 덮으면 메모리에서, 아니면 ob.places_near_many(Overpass 한 번)"""
+    index = load_index(path) if covers(centers, path) else None
+    if index is None:
+        return ob.places_near_many(centers)
+    return [index.places_near(lat, lon, radius_m) for lat, lon, radius_m in centers]
+
+
+def places_near(
+    lat: float, lon: float, radius_m: int, path: str = POI_PATH
+) -> List[Dict[str, Any]]:
+    """로컬 색인이 덮으면 메모리에서, 아니면 ob.places_near"""
+    index = load_index(path) if covers([(lat, lon, radius_m)], path) else None
+    if index is None:
+        return ob.places_near(lat, lon, radius_m)
+    return index.places_near(lat, lon, radius_m)
+
+
+def refresh_in_background(path: str = POI_PATH) -> bool:
+    """백그라운드 스레드로 다시 빌드(한 번에 하나). 시작했으면 True"""
+    global _refreshing
+    with _refresh_lock:
+        if _refreshing:
+            return False
+        _refreshing = True
+
+    def run() -> None:
+        global _refreshing
+        try:
+            build_index(path)
+        except Exception:
+            pass  # 다음 주기에 다시 시도, 그동안은 기존 색인 사용
+        finally:
+            with _refresh_lock:
+                _refreshing = False
+
+    threading.Thread(target=run, name="poi-index-refresh", daemon=True).start()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="서울 카페/바/펍 POI 색인 빌드")
+    ap.add_argument("--path", default=POI_PATH)
+    ap.add_argument("--info", action="store_true", help="빌드하지 않고 현재 상태만 출력")
+    args = ap.parse_args(argv)
+
+    if not args.info:
+        t0 = time.time()
+        n = build_index(args.path)
+        print(f"장소 {n}개 저장 ({time.time() - t0:.1f}s): {args.path}")
+    info = index_info(args.path)
+    if info is None:
+        print("POI 색인 없음")
+        return
+    age_h = (time.time() - info["built_at"]) / 3600
+    print(f"장소 {info['places']}개, bbox {info['bbox']}, {age_h:.1f}시간 전 빌드")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# ratelimit.py
+from __future__ import annotations
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# 프로세스 전역으로 공유하는 호스트(미러)별 토큰 버킷 + 서킷 브레이커
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜) -> 기다릴 초. 없거나 해석 못 하면 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    rate_per_s 속도로 토큰이 차고 최대 capacity개까지 쌓임.
+    penalize(s): Retry-After 등으로 s초 동안 토큰 지급 중단.
+    """
+
+    def __init__(self, rate_per_s: float, capacity: float = 1.0) -> None:
+        self.rate_per_s = float(rate_per_s)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._blocked_until)
+        if now > start:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - start) * self.rate_per_s
+            )
+        self._updated = max(self._updated, now)
+
+    def wait_time(self) -> float:
+        """토큰 하나를 얻기까지 남은 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            blocked = max(0.0, self._blocked_until - now)
+            if self._tokens >= 1.0:
+                return blocked
+            return blocked + (1.0 - self._tokens) / self.rate_per_s
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until or self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def acquire(
+        self, timeout: Optional[float] = None, cancel: Optional[threading.Event] = None
+    ) -> bool:
+        """토큰을 얻을 때까지 대기. timeout 초과/cancel이면 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+            wait_s = max(0.01, self.wait_time())
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                wait_s = min(wait_s, left)
+            if cancel is not None:
+                if cancel.wait(wait_s):
+                    return False
+            else:
+                time.sleep(wait_s)
+
+    def penalize(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
+
+
+class CircuitBreaker:
+    """
+    closed: 정상
+    open: 연속 실패 failure_threshold회 → reset_timeout_s 동안 차단
+    half_open: 차단 시간이 지나면 probe 요청 하나만 허용, 성공하면 closed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_s: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout_s:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def retry_in(self) -> float:
+        """요청이 다시 허용되기까지 남은 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.OPEN:
+                return self._opened_at + self.reset_timeout_s - now
+            if state == self.HALF_OPEN and self._probing:
+                return self.reset_timeout_s
+            return 0.0
+
+    def available(self) -> bool:
+        return self.retry_in() <= 0.0
+
+    def allow(self) -> bool:
+        """요청 허가. half_open이면 probe 권한을 하나만 내줌"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            self._failures += 1
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = now
+            self._probing = False
+
+    def release(self) -> None:
+        """결과 없이 끝난(취소된) 요청의 probe 권한 반납"""
+        with self._lock:
+            self._probing = False
@@ -0,0 +1,180 @@
+# snippet_dedup.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import zlib
+from collections import Counter
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+import jsonl_store
+import naver_url
+
+# 코퍼스 단위 유사 중복 코스 문장 묶기 (shingling + MinHash + LSH)
+# - 글마다 조금씩 고친 같은 코스 설명을 하나의 클러스터로
+# - 클러스터별 "서로 다른 글 수"를 언급 수로 사용(복붙 반복은 한 번)
+# - 문장 수 N에 대해 거의 선형: 서명 계산 O(N·k), 버킷 비교는 버킷 대표와만
+#
+#   python snippet_dedup.py                       # 기본 두 JSON → snippet_clusters.json
+#   python snippet_dedup.py a.json b.jsonl -o out.json --threshold 0.6
+
+SAVE_DIR = "naver_blog_trekking"
+DEFAULT_INPUTS = [
+    os.path.join(SAVE_DIR, "trekking_courses.json"),
+    os.path.join(SAVE_DIR, "tasty_trekking_courses.json"),
+]
+DEFAULT_OUTPUT = os.path.join(SAVE_DIR, "snippet_clusters.json")
+
+SHINGLE = 3  # 글자 3-gram (한국어는 단어보다 글자 단위가 편집에 강함)
+NUM_PERM = 64
+BANDS = 16  # BANDS × ROWS = NUM_PERM, 후보 임계값 ≈ (1/BANDS)^(1/ROWS) ≈ 0.5
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.6  # 같은 클러스터로 볼 추정 Jaccard
+
+# h(x) = (a·x + b) mod p, x는 32비트 crc → a·x + b < 2^64 라 uint64로 계산
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = random.Random(20240601)
+_PERM_A = np.array([_rng.randrange(1, int(_PRIME)) for _ in range(NUM_PERM)], dtype=np.uint64)
+_PERM_B = np.array([_rng.randrange(0, int(_PRIME)) for _ in range(NUM_PERM)], dtype=np.uint64)
+
+_NORM_RE = re.compile(r"[\W_\u200b\ufeff]+")
+
+
+def normalize(text: str) -> str:
+    return _NORM_RE.sub("", text).lower()
+
+
+def shingles(norm: str, k: int = SHINGLE) -> set[int]:
+    if len(norm) <= k:
+        return {zlib.crc32(norm.encode("utf-8"))}
+    return {zlib.crc32(norm[i : i + k].encode("utf-8")) for i in range(len(norm) - k + 1)}
+
+
+def minhash(sh: set[int]) -> np.ndarray:
+    h = np.fromiter(sh, dtype=np.uint64, count=len(sh))
+    return ((np.outer(h, _PERM_A) + _PERM_B) % _PRIME).min(axis=0)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class _UnionFind:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def cluster_texts(texts: list[str], threshold: float = THRESHOLD) -> list[int]:
+    """각 텍스트의 클러스터 번호(대표 인덱스). 정규화 후 완전 동일은 바로 합침"""
+    uf = _UnionFind(len(texts))
+    first_of: dict[str, int] = {}
+    sigs: dict[int, np.ndarray] = {}
+    for i, t in enumerate(texts):
+        norm = normalize(t)
+        j = first_of.setdefault(norm, i)
+        if j != i:
+            uf.union(i, j)
+        elif norm:
+            sigs[i] = minhash(shingles(norm))
+
+    # 밴드별 버킷: 버킷 안에서는 대표(처음 들어온 것)와만 비교 → 선형
+    for band in range(BANDS):
+        lo = band * ROWS
+        buckets: dict[bytes, int] = {}
+        for i, sig in sigs.items():
+            key = sig[lo : lo + ROWS].tobytes()
+            rep = buckets.setdefault(key, i)
+            if rep != i and uf.find(rep) != uf.find(i) and similarity(sig, sigs[rep]) >= threshold:
+                uf.union(rep, i)
+    return [uf.find(i) for i in range(len(texts))]
+
+
+def iter_snippets(paths: Iterable[str]) -> Iterator[tuple[str, str, str]]:
+    """(파일, 글 키, 문장)"""
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        if path.endswith(".jsonl"):
+            # resume으로 다시 기록된 글은 마지막 줄만
+            records: Iterable[dict[str, Any]] = jsonl_store.read_latest(
+                path, key=lambda r: r.get("link", "")
+            )
+        else:
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f).get("results", [])
+        for r in records:
+            link = r.get("link", "")
+            ref = naver_url.parse_post_ref(link)
+            post = f"{ref[0]}:{ref[1]}" if ref else link
+            for s in r.get("course_snippets") or []:
+                if s and s.strip():
+                    yield path, post, s.strip()
+
+
+def dedup_corpus(paths: list[str], threshold: float = THRESHOLD) -> dict[str, Any]:
+    rows = list(iter_snippets(paths))
+    labels = cluster_texts([r[2] for r in rows], threshold=threshold)
+
+    groups: dict[int, list[int]] = {}
+    for i, lab in enumerate(labels):
+        groups.setdefault(lab, []).append(i)
+
+    clusters = []
+    for idxs in groups.values():
+        texts = Counter(rows[i][2] for i in idxs)
+        posts = {rows[i][1] for i in idxs}
+        clusters.append(
+            {
+                "representative": texts.most_common(1)[0][0],
+                "distinct_posts": len(posts),  # 중복 제거된 언급 수
+                "raw_mentions": len(idxs),
+                "variants": len(texts),
+                "sources": sorted({os.path.basename(rows[i][0]) for i in idxs}),
+                "examples": [t for t, _ in texts.most_common(3)],
+            }
+        )
+    clusters.sort(key=lambda c: (c["distinct_posts"], c["raw_mentions"]), reverse=True)
+    for n, c in enumerate(clusters):
+        c["cluster_id"] = n
+
+    return {
+        "inputs": [os.path.basename(p) for p in paths],
+        "threshold": threshold,
+        "snippets": len(rows),
+        "clusters": len(clusters),
+        "results": clusters,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="코스 문장 유사 중복 클러스터링(MinHash/LSH)")
+    ap.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS)
+    ap.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = ap.parse_args(argv)
+
+    out = dedup_corpus(args.inputs, threshold=args.threshold)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+    print(f"문장 {out['snippets']}개 → 클러스터 {out['clusters']}개")
+    print(f"JSON 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# snippets.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping
+
+# 블로그 본문에서 코스 관련 문장 추출 엔진
+# - 키워드(동의어 포함) 전체를 하나의 정규식 alternation으로 컴파일 → 본문을 한 번만 훑음
+# - 문장 경계도 한 번에 찾아두고 이분 탐색으로 매치가 속한 문장을 찾음
+# - 매치 오프셋, 대표 키워드, 앞뒤 문맥 창을 함께 돌려줌
+
+# 대표 키워드 -> 동의어
+DEFAULT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "코스": ("코스",),
+    "루트": ("루트",),
+    "경로": ("경로",),
+    "산책로": ("산책로",),
+    "둘레길": ("둘레길",),
+    "등산로": ("등산로",),
+}
+
+# crawler.extract_course_snippets 기존 동작: 문장 끝(.!?) 뒤 공백 또는 줄바꿈에서 분리
+_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# 주어진 구간에서 마지막 문장 경계까지(탐욕 매치 후 뒤에서부터 되짚음)
+_LAST_BOUNDARY_RE = re.compile(r"[\s\S]*(?:(?<=[.!?])\s+|\n+)")
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    단어 목록 -> 공통 접두어를 묶은 정규식(트라이 모양).
+    단순 a|b|c alternation은 위치마다 모든 단어를 시도하지만,
+    트라이 모양이면 위치마다 첫 글자 한 번만 확인 → 키워드 수와 거의 무관하게 선형.
+    긴 단어 우선("산책로"가 "산책"보다 먼저) 규칙은 유지.
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        end = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 and len(alts[0]) == 1 else "(?:" + "|".join(alts) + ")"
+        return body + "?" if end else body
+
+    return build(trie)
+
+
+@dataclass(frozen=True)
+class SnippetMatch:
+    keyword: str  # 본문에 나온 표현
+    canonical: str  # 대표 키워드
+    start: int  # 본문 내 매치 오프셋
+    end: int
+    sentence: str
+    sentence_start: int
+    sentence_end: int
+    context: str  # 매치 앞뒤 window 글자
+
+
+class SnippetMatcher:
+    def __init__(
+        self,
+        keywords: Mapping[str, Iterable[str]] | Iterable[str] = DEFAULT_KEYWORDS,
+        window: int = 40,
+    ) -> None:
+        if isinstance(keywords, Mapping):
+            groups = {k: tuple(v) or (k,) for k, v in keywords.items()}
+        else:
+            groups = {k: (k,) for k in keywords}
+
+        self.canonical: dict[str, str] = {}
+        for canon, variants in groups.items():
+            for v in (canon, *variants):
+                if v:
+                    self.canonical.setdefault(v, canon)
+        if not self.canonical:
+            raise ValueError("keywords is empty")
+
+        self.pattern = re.compile(trie_pattern(self.canonical))
+        self.window = window
+
+    def _sentence_bounds(self, text: str, start: int, end: int, floor: int) -> tuple[int, int, int]:
+        """
+        [start, end) 매치가 속한 문장의 (시작, 끝, 다음 문장 시작).
+        floor: 이 위치 앞은 이미 지난 문장이라 뒤로 찾지 않음
+        """
+        m = _LAST_BOUNDARY_RE.match(text, floor, start)
+        s0 = m.end() if m else floor
+        b = _BOUNDARY_RE.search(text, end)
+        if b is None:
+            return s0, len(text), len(text)
+        return s0, b.start(), b.end()
+
+    def finditer(self, text: str) -> Iterator[SnippetMatch]:
+        """본문 순서대로 모든 키워드 매치"""
+        w = self.window
+        floor = 0
+        sent: tuple[int, int, int] | None = None
+        for m in self.pattern.finditer(text):
+            if sent is None or m.start() >= sent[2]:
+                sent = self._sentence_bounds(text, m.start(), m.end(), floor)
+                floor = sent[2]
+            yield SnippetMatch(
+                keyword=m.group(0),
+                canonical=self.canonical[m.group(0)],
+                start=m.start(),
+                end=m.end(),
+                sentence=text[sent[0] : sent[1]].strip(),
+                sentence_start=sent[0],
+                sentence_end=sent[1],
+                context=text[max(0, m.start() - w) : m.end() + w],
+            )
+
+    def matches(self, text: str) -> list[SnippetMatch]:
+        return list(self.finditer(text))
+
+    def sentences(self, text: str) -> list[str]:
+        """키워드가 들어간 문장(문장당 한 번, 본문 순서)"""
+        out: list[str] = []
+        pos = 0
+        search = self.pattern.search
+        while True:
+            m = search(text, pos)
+            if m is None:
+                return out
+            s0, s1, pos = self._sentence_bounds(text, m.start(), m.end(), pos)
+            out.append(text[s0:s1].strip())
+            if pos >= len(text):
+                return out
+
+
+DEFAULT_MATCHER = SnippetMatcher()
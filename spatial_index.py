@@ -0,0 +1,166 @@
+# spatial_index.py
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+import geo
+
+# 코스 메모리 공간 색인 (균등 격자)
+# - 코스 bbox는 겹치는 모든 셀에, 시작/종료점은 해당 셀 하나에 등록
+# - bbox 교차 / 반경 N m 안 시작·종료점 / k개 최근접 종료점을
+#   질의 영역 근처 셀만 보고 답함(전체 코스 스캔 없음)
+# - 서울 규모(코스 수백 개)에서는 R-tree보다 단순하고 충분히 빠름
+# - PointIndex: 같은 격자로 점(장소 노드 등)만 색인, 반경 질의는 후보 셀만 NumPy로 거리 계산
+
+CELL_DEG = 0.01  # 약 1.1km
+# geo.haversine_m과 같은 지구 반지름 기준 위도 1도 길이(약 111,195m)
+_M_PER_DEG = math.radians(1) * geo.EARTH_RADIUS_M
+
+Cell = Tuple[int, int]
+BBox = Tuple[float, float, float, float]  # (south, west, north, east)
+
+
+def _cell(lat: float, lon: float) -> Cell:
+    return int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG))
+
+
+def _cells(bbox: BBox) -> Iterable[Cell]:
+    r0, c0 = _cell(bbox[0], bbox[1])
+    r1, c1 = _cell(bbox[2], bbox[3])
+    for r in range(r0, r1 + 1):
+        for c in range(c0, c1 + 1):
+            yield r, c
+
+
+def radius_bbox(lat: float, lon: float, radius_m: float) -> BBox:
+    """(lat, lon) 중심 반경 radius_m 원을 덮는 bbox"""
+    # 원의 경도 폭은 극 쪽 가장자리에서 가장 넓으므로 그 위도의 cos 사용
+    dlat = radius_m / _M_PER_DEG
+    edge_lat = min(abs(lat) + dlat, 90.0)
+    dlon = radius_m / (_M_PER_DEG * max(math.cos(math.radians(edge_lat)), 1e-6))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def course_bbox(course: Dict[str, Any]) -> BBox:
+    # 요약 행(min_lat.. 컬럼) 또는 좌표가 있는 전체 코스
+    if "min_lat" in course:
+        return course["min_lat"], course["min_lon"], course["max_lat"], course["max_lon"]
+    return course["coords"].bbox()
+
+
+class CourseSpatialIndex:
+    def __init__(self, courses: Iterable[Dict[str, Any]]) -> None:
+        self.courses: List[Dict[str, Any]] = list(courses)
+        self.bboxes: List[BBox] = [course_bbox(c) for c in self.courses]
+        self._bbox_grid: Dict[Cell, List[int]] = {}
+        self._points: Dict[str, Dict[Cell, List[int]]] = {"start": {}, "end": {}}
+
+        for i, (c, bb) in enumerate(zip(self.courses, self.bboxes)):
+            for cell in _cells(bb):
+                self._bbox_grid.setdefault(cell, []).append(i)
+            for kind, grid in self._points.items():
+                grid.setdefault(_cell(*self._point(i, kind)), []).append(i)
+
+        rows = [cell[0] for grid in self._points.values() for cell in grid]
+        cols = [cell[1] for grid in self._points.values() for cell in grid]
+        self._extent = (min(rows), min(cols), max(rows), max(cols)) if rows else None
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def _point(self, i: int, kind: str) -> Tuple[float, float]:
+        c = self.courses[i]
+        return float(c[f"{kind}_lat"]), float(c[f"{kind}_lon"])
+
+    def intersecting(self, bbox: BBox) -> List[Dict[str, Any]]:
+        """bbox와 겹치는 코스(입력 순서 유지)"""
+        s, w, n, e = bbox
+        hits: set[int] = set()
+        for cell in _cells(bbox):
+            for i in self._bbox_grid.get(cell, ()):
+                if i in hits:
+                    continue
+                bs, bw, bn, be = self.bboxes[i]
+                if bn >= s and bs <= n and be >= w and bw <= e:
+                    hits.add(i)
+        return [self.courses[i] for i in sorted(hits)]
+
+    def within(
+        self, lat: float, lon: float, radius_m: float, kind: str = "start"
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """kind("start"/"end") 지점이 반경 안인 코스. (거리 m, 코스) 가까운 순"""
+        grid = self._points[kind]
+        out: List[Tuple[float, int]] = []
+        for cell in _cells(radius_bbox(lat, lon, radius_m)):
+            for i in grid.get(cell, ()):
+                d = float(geo.haversine_m(lat, lon, *self._point(i, kind)))
+                if d <= radius_m:
+                    out.append((d, i))
+        out.sort()
+        return [(d, self.courses[i]) for d, i in out]
+
+    def nearest(
+        self, lat: float, lon: float, k: int = 5, kind: str = "end"
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """kind 지점 기준 k개 최근접 코스. 셀 고리를 한 겹씩 넓히며 탐색"""
+        if k <= 0 or self._extent is None:
+            return []
+        grid = self._points[kind]
+        r0, c0 = _cell(lat, lon)
+        # 고리 ring 바깥 셀까지의 최소 거리(위·경도 중 짧은 쪽 기준).
+        # 경도 간격은 고리 가장자리(극 쪽) 위도에서 가장 좁으므로 그 위도의 cos 사용
+        def ring_m(ring: int) -> float:
+            edge_lat = min(abs(lat) + (ring + 1) * CELL_DEG, 90.0)
+            return ring * CELL_DEG * _M_PER_DEG * math.cos(math.radians(edge_lat))
+
+        max_ring = max(
+            abs(r0 - self._extent[0]), abs(r0 - self._extent[2]),
+            abs(c0 - self._extent[1]), abs(c0 - self._extent[3]),
+        )
+        best: List[Tuple[float, int]] = []  # 최대 힙(-거리)
+        for ring in range(max_ring + 1):
+            for r in range(r0 - ring, r0 + ring + 1):
+                edge = r in (r0 - ring, r0 + ring)
+                cols = range(c0 - ring, c0 + ring + 1) if edge else (c0 - ring, c0 + ring)
+                for c in cols:
+                    for i in grid.get((r, c), ()):
+                        d = float(geo.haversine_m(lat, lon, *self._point(i, kind)))
+                        if len(best) < k:
+                            heapq.heappush(best, (-d, i))
+                        elif d < -best[0][0]:
+                            heapq.heapreplace(best, (-d, i))
+            if len(best) == k and -best[0][0] <= ring_m(ring):
+                break
+        return [(-nd, self.courses[i]) for nd, i in sorted(best, reverse=True)]
+
+
+class PointIndex:
+    """(lat, lon) 점 목록의 격자 색인. 결과는 입력 순서 번호"""
+
+    def __init__(self, points: Sequence[Tuple[float, float]]) -> None:
+        self.points = geo.as_array(points)
+        self._grid: Dict[Cell, List[int]] = {}
+        for i, (lat, lon) in enumerate(self.points.tolist()):
+            self._grid.setdefault(_cell(lat, lon), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Tuple[float, int]]:
+        """반경 안의 점. (거리 m, 번호) 가까운 순"""
+        cand = [
+            i
+            for cell in _cells(radius_bbox(lat, lon, radius_m))
+            for i in self._grid.get(cell, ())
+        ]
+        if not cand:
+            return []
+        idx = np.array(cand)
+        d = geo.distances_from(lat, lon, self.points[idx])
+        ok = d <= radius_m
+        order = np.argsort(d[ok], kind="stable")
+        return list(zip(d[ok][order].tolist(), idx[ok][order].tolist()))
@@ -0,0 +1,180 @@
+# stitch.py
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import geo
+
+# relation 멤버 way들을 이어 붙이는 엔진
+# 1) way 끝점끼리 JOIN_M 안이면 같은 노드로 묶음(격자 해시, 끝점 수에 선형)
+# 2) 노드 = 묶인 끝점, 간선 = way 인 무향 그래프
+# 3) 연결 요소마다 홀수 차수 노드를 가상 간선으로 짝지어 오일러 회로(Hierholzer)를 만들고
+#    가상 간선에서 끊음 → 요소당 max(1, 홀수 노드 수 / 2)개, 즉 가능한 최소 개수의 연속 구간
+# 4) 구간 안에서는 way 방향을 진행 방향에 맞게 뒤집어 이음
+# 5) 구간 순서: 가장 긴 구간부터, 현재 끝에서 가장 가까운 구간을 (필요하면 뒤집어) 이어감
+# relation 순서·way 방향과 무관하게 지그재그 없이 이어지고, 끊긴 곳은 여러 구간(MultiLineString)
+
+JOIN_M = 5.0
+# geo.haversine_m과 같은 지구 반지름 기준 위도 1도 길이(약 111,195m)
+_M_PER_DEG = math.radians(1) * geo.EARTH_RADIUS_M
+
+Edge = Tuple[int, int, int]  # (way 번호, 출발 노드, 도착 노드)
+
+
+def _snap_endpoints(ways: List[np.ndarray], join_m: float) -> List[Tuple[int, int]]:
+    """way별 (시작 노드, 끝 노드). join_m 안의 끝점은 같은 노드"""
+    pts = [(w[0], w[-1]) for w in ways]
+    flat = [p for pair in pts for p in pair]
+    parent = list(range(len(flat)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # 셀 한 변 >= join_m 이라 이웃 8칸만 보면 됨(경도 셀은 가장 높은 위도 기준으로 넓힘)
+    # 반올림 오차에도 join_m보다 작아지지 않도록 1% 여유
+    max_lat = max(abs(p[0]) for p in flat)
+    cell_lat = join_m * 1.01 / _M_PER_DEG
+    cell_lon = cell_lat / max(math.cos(math.radians(max_lat)), 1e-6)
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i, (lat, lon) in enumerate(flat):
+        ci, cj = int(math.floor(lat / cell_lat)), int(math.floor(lon / cell_lon))
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for j in grid.get((ci + di, cj + dj), ()):
+                    if find(i) != find(j) and (
+                        geo.haversine_m(lat, lon, flat[j][0], flat[j][1]) < join_m
+                    ):
+                        parent[find(i)] = find(j)
+        grid.setdefault((ci, cj), []).append(i)
+
+    ids: Dict[int, int] = {}
+    nodes = [ids.setdefault(find(i), len(ids)) for i in range(len(flat))]
+    return [(nodes[2 * k], nodes[2 * k + 1]) for k in range(len(ways))]
+
+
+def _trails(ends: List[Tuple[int, int]]) -> List[List[Edge]]:
+    """간선 전체를 덮는 최소 개수의 trail(간선 순서 + 진행 방향)"""
+    adj: Dict[int, List[Tuple[int, int]]] = {}  # 노드 -> [(간선 번호, 상대 노드)]
+    for e, (a, b) in enumerate(ends):
+        adj.setdefault(a, []).append((e, b))
+        adj.setdefault(b, []).append((e, a))
+
+    # 연결 요소
+    comp: Dict[int, int] = {}
+    for start in adj:
+        if start in comp:
+            continue
+        comp[start] = start
+        stack = [start]
+        while stack:
+            v = stack.pop()
+            for _, u in adj[v]:
+                if u not in comp:
+                    comp[u] = start
+                    stack.append(u)
+
+    # 요소별 홀수 차수 노드를 가상 간선으로 짝지음(번호 >= len(ends))
+    n_real = len(ends)
+    odd_by_comp: Dict[int, List[int]] = {}
+    for v, lst in adj.items():
+        if len(lst) % 2:
+            odd_by_comp.setdefault(comp[v], []).append(v)
+    e = n_real
+    for odd in odd_by_comp.values():
+        for a, b in zip(odd[0::2], odd[1::2]):
+            adj[a].append((e, b))
+            adj[b].append((e, a))
+            e += 1
+
+    used = [False] * e
+    ptr = {v: 0 for v in adj}
+    trails: List[List[Edge]] = []
+    for root in dict.fromkeys(comp.values()):
+        # Hierholzer (반복문)
+        stack: List[Tuple[int, Optional[Edge]]] = [(root, None)]
+        circuit: List[Edge] = []
+        while stack:
+            v, via = stack[-1]
+            lst = adj[v]
+            i = ptr[v]
+            while i < len(lst) and used[lst[i][0]]:
+                i += 1
+            ptr[v] = i
+            if i < len(lst):
+                eid, u = lst[i]
+                used[eid] = True
+                stack.append((u, (eid, v, u)))
+            else:
+                stack.pop()
+                if via is not None:
+                    circuit.append(via)
+        circuit.reverse()
+
+        # 가상 간선 다음부터 시작하도록 회전 후 가상 간선에서 끊음
+        virt = [k for k, ed in enumerate(circuit) if ed[0] >= n_real]
+        if virt:
+            circuit = circuit[virt[0] + 1 :] + circuit[: virt[0] + 1]
+        cur: List[Edge] = []
+        for ed in circuit:
+            if ed[0] >= n_real:
+                if cur:
+                    trails.append(cur)
+                cur = []
+            else:
+                cur.append(ed)
+        if cur:
+            trails.append(cur)
+    return trails
+
+
+def _join(
+    ways: List[np.ndarray], ends: List[Tuple[int, int]], trail: List[Edge], join_m: float
+) -> np.ndarray:
+    parts: List[np.ndarray] = []
+    for wi, frm, _ in trail:
+        w = ways[wi]
+        if ends[wi][0] != frm:
+            w = w[::-1]
+        if parts:
+            last = parts[-1][-1]
+            if geo.haversine_m(last[0], last[1], w[0, 0], w[0, 1]) < join_m:
+                w = w[1:]
+        parts.append(w)
+    return np.concatenate(parts)
+
+
+def _order_segments(segments: List[np.ndarray]) -> List[np.ndarray]:
+    """가장 긴 구간부터, 현재 끝에서 가장 가까운 구간을 이어 붙이는 순서"""
+    if len(segments) <= 1:
+        return segments
+    rest = sorted(segments, key=geo.polyline_length_m, reverse=True)
+    out = [rest.pop(0)]
+    while rest:
+        end = out[-1][-1]
+        heads = np.array([s[0] for s in rest])
+        tails = np.array([s[-1] for s in rest])
+        dh = geo.distances_from(end[0], end[1], heads)
+        dt = geo.distances_from(end[0], end[1], tails)
+        k = int(np.argmin(np.minimum(dh, dt)))
+        seg = rest.pop(k)
+        out.append(seg if dh[k] <= dt[k] else seg[::-1])
+    return out
+
+
+def stitch_ways(ways: List[np.ndarray], join_m: float = JOIN_M) -> List[np.ndarray]:
+    """
+    way 좌표 배열들((N, 2), 2점 이상) → 연속 구간 배열 목록.
+    1개면 LineString, 여러 개면 MultiLineString에 해당
+    """
+    ways = [w for w in ways if len(w) >= 2]
+    if not ways:
+        return []
+    ends = _snap_endpoints(ways, join_m)
+    segments = [_join(ways, ends, t, join_m) for t in _trails(ends)]
+    return _order_segments(segments)
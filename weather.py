@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import http_client
+
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+
+def openweather_current(lat: float, lon: float, api_key: str) -> Dict[str, Any]:
+    params = {
+        "lat": lat,
+        "lon": lon,
+        "appid": api_key,
+        "units": "metric",
+        "lang": "kr",
+    }
+    r = http_client.get(OPENWEATHER_URL, params=params, timeout=10)
+    r.raise_for_status()
+    return r.json()